@@ -24,17 +24,51 @@ class Bounds():
         if point.z > self.max.z:
             self.max.z = point.z 
 
+    # an empty box, such as the overlap of two that do not meet, adds nothing
     def add_box(self, box: 'Bounds') -> None:
+        if box.is_empty():
+            return
         self.add_point(box.min)
         self.add_point(box.max)
 
+    def is_empty(self) -> bool:
+        return self.min.x > self.max.x or self.min.y > self.max.y or self.min.z > self.max.z
+
+    # the box covered by both this box and the other, which may be empty
+    def overlap(self, box: 'Bounds') -> 'Bounds':
+        overlap = Bounds(Point(max(self.min.x, box.min.x), max(self.min.y, box.min.y), max(self.min.z, box.min.z)),
+                         Point(min(self.max.x, box.max.x), min(self.max.y, box.max.y), min(self.max.z, box.max.z)))
+        if overlap.is_empty():
+            return Bounds()
+        return overlap
+
     def box_contains_point(self, point: Point) -> bool:
         return self.min.x <= point.x <= self.max.x and self.min.y <= point.y <= self.max.y and self.min.z <= point.z <= self.max.z
 
     def box_contains_box(self, box: 'Bounds') -> bool:
         return self.box_contains_point(box.min) and self.box_contains_point(box.max)
 
+    def is_finite(self) -> bool:
+        return all(math.isfinite(value) for value in (self.min.x, self.min.y, self.min.z, self.max.x, self.max.y, self.max.z))
+
+    def surface_area(self) -> float:
+        if self.is_empty():
+            return 0.0
+        if not self.is_finite():
+            return math.inf
+
+        dx = self.max.x - self.min.x
+        dy = self.max.y - self.min.y
+        dz = self.max.z - self.min.z
+        return 2 * (dx * dy + dy * dz + dz * dx)
+
+    def centroid(self) -> Point:
+        return Point((self.min.x + self.max.x) / 2, (self.min.y + self.max.y) / 2, (self.min.z + self.max.z) / 2)
+
     def transform(self, matrix) -> 'Bounds':
+        if self.is_empty():
+            return Bounds()
+
         p1 = self.min
         p2 = Point(self.min.x, self.min.y, self.max.z)
         p3 = Point(self.min.x, self.max.y, self.min.z)
@@ -45,15 +79,39 @@ class Bounds():
         p8 = self.max
 
         new_bbox = Bounds()
+        rows = Matrix.rows(matrix)
+
+        if self.is_finite():
+            for p in [p1, p2, p3, p4, p5, p6, p7, p8]:
+                new_bbox.add_point(Matrix.multiply_tuple(rows, p))
+            return new_bbox
 
+        # an infinite box, like a plane's: terms of zero entries are left out,
+        # as 0 * inf is nan, and an axis that sums inf and -inf is unbounded
         for p in [p1, p2, p3, p4, p5, p6, p7, p8]:
-            new_bbox.add_point(Matrix.multiply_tuple(matrix, p))
+            coordinates = (p.x, p.y, p.z, 1)
+            values = [sum(m * c for m, c in zip(row, coordinates) if m != 0) for row in rows[:3]]
+            new_bbox.add_point(Point(*[-math.inf if math.isnan(v) else v for v in values]))
+            new_bbox.add_point(Point(*[math.inf if math.isnan(v) else v for v in values]))
 
         return new_bbox
 
     def intersects(self, ray) -> bool:
+        tmin, tmax = self.intersect_distances(ray)
+
+        if tmin > tmax:
+            return False
+
+        return True
+
+    # the distances at which the ray enters and leaves the box.
+    # the ray misses the box if tmin > tmax, as it misses every empty box.
+    def intersect_distances(self, ray) -> Tuple[float, float]:
         from cube import Cube
 
+        if self.is_empty():
+            return math.inf, -math.inf
+
         xtmin, xtmax = Cube.check_axis(ray.origin.x, ray.direction.x, self.min.x, self.max.x)
         ytmin, ytmax = Cube.check_axis(ray.origin.y, ray.direction.y, self.min.y, self.max.y)
         ztmin, ztmax = Cube.check_axis(ray.origin.z, ray.direction.z, self.min.z, self.max.z)
@@ -61,10 +119,7 @@ class Bounds():
         tmin = max([xtmin, ytmin, ztmin])
         tmax = min([xtmax, ytmax, ztmax])
 
-        if tmin > tmax:
-            return False
-
-        return True
+        return tmin, tmax
 
     def split_bounds(box: 'Bounds') -> Tuple['Bounds', 'Bounds']:
         # figure out the box's largest dimension
@@ -0,0 +1,202 @@
+import math
+import numpy as np
+
+from bounds import Bounds
+from cube import Cube
+from intersection import Intersection
+from ray import Ray
+from shape import Shape
+from typing import Any, Callable, Iterable, List, Tuple as PythonTuple
+
+class BVH:
+    # a group hierarchy compiled into flat arrays. node i covers the box
+    # node_bounds[i] (min x, y, z then max x, y, z), has the child nodes
+    # child_indices[child_offsets[i]:child_offsets[i + 1]] and the primitives
+    # primitives[prim_offsets[i]:prim_offsets[i + 1]], whose boxes are in
+    # prim_bounds. node 0 is the root. rays are traced in the object space of
+    # the shape the hierarchy was built for, its root shape, if it has one.
+    def __init__(self, node_bounds: np.ndarray, child_offsets: np.ndarray, child_indices: np.ndarray, prim_offsets: np.ndarray, prim_bounds: np.ndarray, primitives: List[Shape], root_shape: Shape = None):
+        self.node_bounds: np.ndarray = node_bounds
+        self.child_offsets: np.ndarray = child_offsets
+        self.child_indices: np.ndarray = child_indices
+        self.prim_offsets: np.ndarray = prim_offsets
+        self.prim_bounds: np.ndarray = prim_bounds
+        self.primitives: List[Shape] = primitives
+        self.root_shape: Shape = root_shape
+
+        # traversal reads single elements, which is much faster from lists
+        self.node_box_list = node_bounds.tolist()
+        self.child_offset_list = child_offsets.tolist()
+        self.child_index_list = child_indices.tolist()
+        self.prim_offset_list = prim_offsets.tolist()
+        self.prim_box_list = prim_bounds.tolist()
+
+    # subgroups with an identity transform share the root's space and become
+    # nodes; every other member, including transformed groups, is a primitive
+    def from_group(group: 'Group') -> 'BVH':
+        from group import Group
+
+        node_boxes = []
+        child_offsets = [0]
+        child_indices = []
+        prim_offsets = [0]
+        prim_boxes = []
+        primitives = []
+
+        nodes = [group]
+        index = 0
+        while index < len(nodes):
+            node = nodes[index]
+            node_boxes.append(BVH.box_row(node.bounds_of()))
+            for member, box in zip(node.members, node.member_bounds):
+                if isinstance(member, Group) and member.identity_transform:
+                    child_indices.append(len(nodes))
+                    nodes.append(member)
+                else:
+                    primitives.append(member)
+                    prim_boxes.append(BVH.box_row(box))
+            child_offsets.append(len(child_indices))
+            prim_offsets.append(len(primitives))
+            index += 1
+
+        return BVH(np.array(node_boxes, dtype = float).reshape(-1, 6),
+                   np.array(child_offsets, dtype = np.int64),
+                   np.array(child_indices, dtype = np.int64),
+                   np.array(prim_offsets, dtype = np.int64),
+                   np.array(prim_boxes, dtype = float).reshape(-1, 6),
+                   primitives, group)
+
+    # builds a hierarchy over an N x 6 array of primitive boxes by splitting each
+    # node at the median centroid along its widest axis, until no more than
+    # leaf_size boxes remain. make_leaf(start, end) creates the single primitive
+    # of a leaf, covering positions start to end of the returned order, which is
+    # the permutation that makes every leaf's boxes contiguous.
+    def from_boxes(boxes: np.ndarray, leaf_size: int, make_leaf: Callable[[int, int], Any]) -> PythonTuple['BVH', np.ndarray]:
+        centroids = (boxes[:, :3] + boxes[:, 3:]) / 2
+        order = np.arange(len(boxes))
+
+        node_boxes = []
+        child_offsets = [0]
+        child_indices = []
+        prim_offsets = [0]
+        prim_boxes = []
+        primitives = []
+
+        ranges = [(0, len(boxes))]
+        index = 0
+        while index < len(ranges):
+            (start, end) = ranges[index]
+            members = order[start:end]
+            box = np.concatenate((boxes[members, :3].min(axis = 0), boxes[members, 3:].max(axis = 0)))
+            node_boxes.append(box)
+
+            if end - start <= leaf_size:
+                primitives.append(make_leaf(start, end))
+                prim_boxes.append(box)
+            else:
+                member_centroids = centroids[members]
+                axis = np.argmax(member_centroids.max(axis = 0) - member_centroids.min(axis = 0))
+                middle = (end - start) // 2
+                order[start:end] = members[np.argpartition(member_centroids[:, axis], middle)]
+                child_indices.extend([len(ranges), len(ranges) + 1])
+                ranges.extend([(start, start + middle), (start + middle, end)])
+
+            child_offsets.append(len(child_indices))
+            prim_offsets.append(len(primitives))
+            index += 1
+
+        bvh = BVH(np.array(node_boxes, dtype = float).reshape(-1, 6),
+                  np.array(child_offsets, dtype = np.int64),
+                  np.array(child_indices, dtype = np.int64),
+                  np.array(prim_offsets, dtype = np.int64),
+                  np.array(prim_boxes, dtype = float).reshape(-1, 6),
+                  primitives)
+        return bvh, order
+
+    def box_row(box: Bounds) -> List[float]:
+        return [box.min.x, box.min.y, box.min.z, box.max.x, box.max.y, box.max.z]
+
+    # the distances at which the ray enters and leaves a box row, as Bounds.intersect_distances
+    def box_distances(box: List[float], ray: Ray) -> PythonTuple[float, float]:
+        if box[0] > box[3] or box[1] > box[4] or box[2] > box[5]:
+            return math.inf, -math.inf
+
+        xtmin, xtmax = Cube.check_axis(ray.origin.x, ray.direction.x, box[0], box[3])
+        ytmin, ytmax = Cube.check_axis(ray.origin.y, ray.direction.y, box[1], box[4])
+        ztmin, ztmax = Cube.check_axis(ray.origin.z, ray.direction.z, box[2], box[5])
+
+        return max(xtmin, ytmin, ztmin), min(xtmax, ytmax, ztmax)
+
+    # the primitives whose boxes the ray passes through in front of t_max, in no particular order
+    def candidates(self, ray: Ray, t_max: float = math.inf) -> Iterable[Shape]:
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            tmin, tmax = BVH.box_distances(self.node_box_list[node], ray)
+            if tmin > tmax or tmax < 0 or tmin >= t_max:
+                continue
+
+            for prim in range(self.prim_offset_list[node], self.prim_offset_list[node + 1]):
+                tmin, tmax = BVH.box_distances(self.prim_box_list[prim], ray)
+                if tmin <= tmax and tmax >= 0 and tmin < t_max:
+                    yield self.primitives[prim]
+
+            stack.extend(self.child_index_list[self.child_offset_list[node]:self.child_offset_list[node + 1]])
+
+    def intersect(self, ray: Ray) -> List[Intersection]:
+        # without a range limit every primitive box hit counts, including those behind the ray
+        xs = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            tmin, tmax = BVH.box_distances(self.node_box_list[node], ray)
+            if tmin > tmax:
+                continue
+
+            for prim in range(self.prim_offset_list[node], self.prim_offset_list[node + 1]):
+                tmin, tmax = BVH.box_distances(self.prim_box_list[prim], ray)
+                if tmin <= tmax:
+                    xs.extend(self.primitives[prim].intersect(ray))
+
+            stack.extend(self.child_index_list[self.child_offset_list[node]:self.child_offset_list[node + 1]])
+
+        return sorted(xs, key = lambda intersection: intersection.t)
+
+    def occluded(self, ray: Ray, distance: float) -> bool:
+        for primitive in self.candidates(ray, distance):
+            if primitive.occluded(ray, distance):
+                return True
+        return False
+
+    # visits nodes nearest entry first and drops any whose box starts beyond the best hit
+    def intersect_closest(self, ray: Ray, t_max: float = math.inf) -> Intersection:
+        closest = None
+        tmin, tmax = BVH.box_distances(self.node_box_list[0], ray)
+        if tmin > tmax or tmax < 0:
+            return None
+
+        stack = [(tmin, 0)]
+        while stack:
+            entry, node = stack.pop()
+            if entry >= t_max:
+                continue
+
+            for prim in range(self.prim_offset_list[node], self.prim_offset_list[node + 1]):
+                tmin, tmax = BVH.box_distances(self.prim_box_list[prim], ray)
+                if tmin <= tmax and tmax >= 0 and tmin < t_max:
+                    hit = self.primitives[prim].intersect_closest(ray, t_max)
+                    if hit is not None:
+                        closest = hit
+                        t_max = hit.t
+
+            children = []
+            for child in self.child_index_list[self.child_offset_list[node]:self.child_offset_list[node + 1]]:
+                tmin, tmax = BVH.box_distances(self.node_box_list[child], ray)
+                if tmin <= tmax and tmax >= 0 and tmin < t_max:
+                    children.append((tmin, child))
+
+            # the nearest child ends up on top of the stack
+            children.sort(key = lambda candidate: candidate[0], reverse = True)
+            stack.extend(children)
+
+        return closest
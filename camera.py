@@ -1,13 +1,41 @@
 import math
+import multiprocessing
 import numpy as np
 
-from canvas import Canvas
-from matrix import Matrix
+from canvas import Canvas, PPMStream
+from color import Color
+from matrix import Matrix, Transformable
 from ray import Ray
 from tuple import Point, Vector
+from typing import Iterable, Iterator, List, Tuple as PythonTuple
 from world import World
 
-class Camera:
+# the scene each render worker process draws from, shipped once by the pool
+# initializer, and the file-backed canvas it writes into, if any
+_worker_camera: 'Camera' = None
+_worker_world: World = None
+_worker_canvas: Canvas = None
+
+def _init_render_worker(camera: 'Camera', world: World, canvas: Canvas = None) -> None:
+    global _worker_camera, _worker_world, _worker_canvas
+    _worker_camera = camera
+    _worker_world = world
+    _worker_canvas = canvas
+
+# returns the tile with its colors as an h x w x 3 array, ready for
+# Canvas.write_tile, or with None once they are written to the worker's canvas
+def _render_tile(tile: PythonTuple[int, int, int, int]) -> PythonTuple[PythonTuple[int, int, int, int], np.ndarray]:
+    colors = Camera.render_tile(_worker_camera, _worker_world, *tile)
+    if _worker_canvas is None:
+        return tile, colors
+
+    Canvas.write_tile(_worker_canvas, tile[0], tile[1], colors)
+    return tile, None
+
+def _render_tile_vectorized(tile: PythonTuple[int, int, int, int]) -> PythonTuple[PythonTuple[int, int, int, int], np.ndarray]:
+    return tile, Camera.render_tile_vectorized(_worker_camera, _worker_world, *tile)
+
+class Camera(Transformable):
     def __init__(self, hsize: int, vsize: int, field_of_view: float):
         self.hsize: int = hsize
         self.vsize: int = vsize
@@ -25,6 +53,17 @@ class Camera:
             self.half_height = half_view
 
         self.pixel_size = (self.half_width * 2) / self.hsize
+
+    def transform_changed(self) -> None:
+        self._origin = None
+
+    # where every ray starts: the world space origin of the camera, computed
+    # once per transform
+    @property
+    def origin(self) -> Point:
+        if self._origin is None:
+            self._origin = Matrix.multiply_tuple(self.inverse_rows, Point(0, 0, 0))
+        return self._origin
     
     def ray_for_pixel(camera: 'Camera', px: float, py: float) -> Ray:
         # the offset from the edge of the canvas to the pixel's center
@@ -39,19 +78,121 @@ class Camera:
         # using the camera matrix, transform the canvas point and the origin
         # and then compute the ray's direction vector.
         # (remember that the canvas is at z=-1)
-        pixel = Matrix.multiply_tuple(Matrix.inverse(camera.transform), Point(world_x, world_y, -1))
-        origin = Matrix.multiply_tuple(Matrix.inverse(camera.transform), Point(0, 0, 0))
+        pixel = Matrix.multiply_tuple(camera.inverse_rows, Point(world_x, world_y, -1))
+        origin = camera.origin
         direction = Vector.normalize(pixel - origin)
 
         return Ray(origin, direction)
 
-    def render(camera: 'Camera', world: World) -> Canvas:
-        image = Canvas(camera.hsize, camera.vsize)
+    # the primary rays for the pixels x0 <= x < x1, y0 <= y < y1 as N x 4 origin
+    # and direction arrays, in row-major order
+    def rays_for_tile(camera: 'Camera', x0: int, y0: int, x1: int, y1: int) -> PythonTuple[np.ndarray, np.ndarray]:
+        xs, ys = np.meshgrid(np.arange(x0, x1), np.arange(y0, y1))
+        world_x = camera.half_width - (xs.ravel() + 0.5) * camera.pixel_size
+        world_y = camera.half_height - (ys.ravel() + 0.5) * camera.pixel_size
+
+        count = len(world_x)
+        pixels = np.column_stack((world_x, world_y, np.full(count, -1.0), np.ones(count))).dot(camera.inverse_transpose)
+        origin = camera.inverse_transform[:, 3]
+        directions = pixels - origin
+        directions /= np.linalg.norm(directions, axis = 1)[:, np.newaxis]
+
+        return np.tile(origin, (count, 1)), directions
+
+    def color_for_pixel(camera: 'Camera', world: World, x: int, y: int) -> Color:
+        ray = Camera.ray_for_pixel(camera, x, y)
+        return World.color_at(world, ray)
+
+    # the colors of the pixels x0 <= x < x1, y0 <= y < y1 as an h x w x 3 array.
+    # the rays of the whole tile are set up at once.
+    def render_tile(camera: 'Camera', world: World, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        rays = World.rays_from_arrays(*Camera.rays_for_tile(camera, x0, y0, x1, y1))
+        colors = [World.color_at(world, ray) for ray in rays]
+        return np.array([(color.red, color.green, color.blue) for color in colors], dtype = float).reshape(y1 - y0, x1 - x0, 3)
+
+    # the (x0, y0, x1, y1) pixel rectangles covering the canvas, row by row
+    def tiles(camera: 'Camera', tile_size: int) -> Iterable[PythonTuple[int, int, int, int]]:
+        for y0 in range(0, camera.vsize, tile_size):
+            for x0 in range(0, camera.hsize, tile_size):
+                yield (x0, y0, min(x0 + tile_size, camera.hsize), min(y0 + tile_size, camera.vsize))
+
+    # with workers > 1 the canvas is split into tiles that are rendered by a
+    # process pool. every pixel is computed by the same code as the serial path,
+    # so the image is identical whatever the worker count. the image is drawn
+    # into canvas when one is given; workers write straight into a file-backed
+    # canvas instead of sending their tiles back.
+    def render(camera: 'Camera', world: World, workers: int = 1, tile_size: int = 16, canvas: Canvas = None) -> Canvas:
+        image = Canvas(camera.hsize, camera.vsize) if canvas is None else canvas
 
-        for y in range(camera.vsize):
-            for x in range(camera.hsize):
-                ray = Camera.ray_for_pixel(camera, x, y)
-                color = World.color_at(world, ray)
-                Canvas.write_pixel(image, x, y, color)
+        if workers <= 1:
+            for y in range(camera.vsize):
+                Canvas.write_tile(image, 0, y, Camera.render_tile(camera, world, 0, y, camera.hsize, y + 1))
 
+            Canvas.flush(image)
+            return image
+
+        shared_canvas = image if isinstance(image.pixels, np.memmap) else None
+        with multiprocessing.Pool(workers, initializer = _init_render_worker, initargs = (camera, world, shared_canvas)) as pool:
+            for (x0, y0, _, _), colors in pool.imap_unordered(_render_tile, Camera.tiles(camera, tile_size)):
+                if colors is not None:
+                    Canvas.write_tile(image, x0, y0, colors)
+
+        Canvas.flush(image)
         return image
+
+    # render tile by tile, finding the primary hits of a whole tile at once.
+    # shading still goes through World.shade_hit, so the result matches render.
+    def render_vectorized(camera: 'Camera', world: World, tile_size: int = 64, canvas: Canvas = None) -> Canvas:
+        image = Canvas(camera.hsize, camera.vsize) if canvas is None else canvas
+
+        for x0, y0, x1, y1 in Camera.tiles(camera, tile_size):
+            Canvas.write_tile(image, x0, y0, Camera.render_tile_vectorized(camera, world, x0, y0, x1, y1))
+
+        Canvas.flush(image)
+        return image
+
+    # render_tile with the primary hits of the whole tile found at once
+    def render_tile_vectorized(camera: 'Camera', world: World, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        origins, directions = Camera.rays_for_tile(camera, x0, y0, x1, y1)
+        hits = World.hit_batch(world, origins, directions)
+
+        # pixels whose rays missed everything stay black
+        colors = np.zeros((len(hits), 3))
+        hit_indices = [index for index, hit in enumerate(hits) if hit is not None]
+        rays = World.rays_from_arrays(origins[hit_indices], directions[hit_indices])
+        for index, ray in zip(hit_indices, rays):
+            color = World.color_for_hit(world, hits[index], ray)
+            colors[index] = (color.red, color.green, color.blue)
+
+        return colors.reshape(y1 - y0, x1 - x0, 3)
+
+    # yields (y0, colors) for consecutive blocks of up to rows scanlines from the
+    # top of the image down, colors being an h x hsize x 3 array, without ever
+    # holding the whole image. the pool keeps at most a few blocks per worker
+    # ahead of the consumer.
+    def render_rows(camera: 'Camera', world: World, rows: int = 16, workers: int = 1, vectorized: bool = False) -> Iterator[PythonTuple[int, np.ndarray]]:
+        blocks = [(0, y0, camera.hsize, min(y0 + rows, camera.vsize)) for y0 in range(0, camera.vsize, rows)]
+
+        if workers <= 1:
+            render_tile = Camera.render_tile_vectorized if vectorized else Camera.render_tile
+            for block in blocks:
+                yield block[1], render_tile(camera, world, *block)
+            return
+
+        with multiprocessing.Pool(workers, initializer = _init_render_worker, initargs = (camera, world)) as pool:
+            task = _render_tile_vectorized if vectorized else _render_tile
+            pending = []
+            for block in blocks:
+                pending.append(pool.apply_async(task, (block,)))
+                if len(pending) >= 2 * workers:
+                    block, colors = pending.pop(0).get()
+                    yield block[1], colors
+            for result in pending:
+                block, colors = result.get()
+                yield block[1], colors
+
+    # renders straight into a binary PPM file at path, a block of rows at a time
+    def render_to_ppm(camera: 'Camera', world: World, path: str, rows: int = 16, workers: int = 1, vectorized: bool = False) -> None:
+        with PPMStream(path, camera.hsize, camera.vsize) as stream:
+            for _, colors in Camera.render_rows(camera, world, rows, workers, vectorized):
+                stream.write_rows(colors)
@@ -1,41 +1,151 @@
+import numpy as np
+
 from color import Color
 
 class Canvas:
-    def __init__(self, width, height):
+    # pixels may be any height x width x 3 array to draw into, such as one of
+    # the file mappings made by memmap and memmap_ppm
+    def __init__(self, width, height, pixels = None):
         self.width = width
         self.height = height
-        self.pixels = [[Color(0, 0, 0) for _ in range(width)] for _ in range(height)] 
+        # red, green and blue of each pixel, indexed [y, x]
+        self.pixels = np.zeros((height, width, 3)) if pixels is None else pixels
+
+    # a canvas whose float pixels live in the .npy file at path rather than in
+    # memory, so that the operating system pages them in and out as needed
+    def memmap(width, height, path):
+        return Canvas(width, height, np.lib.format.open_memmap(path, mode = "w+", dtype = float, shape = (height, width, 3)))
+
+    # a canvas mapped over the pixel bytes of a new binary PPM at path. colors
+    # are quantized as they are written, so the file is a finished P6 image
+    # once the canvas is flushed, and pixel_at only returns them to 1/255.
+    def memmap_ppm(width, height, path):
+        header = f"P6\n{width} {height}\n255\n".encode()
+        with open(path, "wb") as ppm_file:
+            ppm_file.write(header)
+            ppm_file.truncate(len(header) + width * height * 3)
+        return Canvas(width, height, np.memmap(path, dtype = np.uint8, mode = "r+", offset = len(header), shape = (height, width, 3)))
+
+    # a mapped canvas travels to other processes as its file, which they map again
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if isinstance(self.pixels, np.memmap):
+            state["pixels"] = (self.pixels.filename, self.pixels.offset, self.pixels.dtype.str)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if isinstance(self.pixels, tuple):
+            path, offset, dtype = self.pixels
+            self.pixels = np.memmap(path, dtype = np.dtype(dtype), mode = "r+", offset = offset, shape = (self.height, self.width, 3))
+
+    # writes anything still held in memory out to a mapped canvas's file
+    def flush(self):
+        if isinstance(self.pixels, np.memmap):
+            self.pixels.flush()
+
+    # colors as they are stored in the pixels
+    def encode(self, colors):
+        return Canvas.quantize_colors(colors) if self.pixels.dtype == np.uint8 else colors
 
     def write_pixel(self, x, y, color):
         if x < 0 or x >= self.width or y < 0 or y >= self.height:
             return
-        self.pixels[y][x] = color
+        self.pixels[y, x] = self.encode((color.red, color.green, color.blue))
 
     def pixel_at(self, x, y):
-        return self.pixels[y][x]
+        if self.pixels.dtype == np.uint8:
+            return Color(*(self.pixels[y, x] / 255).tolist())
+        return Color(*self.pixels[y, x].tolist())
+
+    # writes an h x w x 3 array of colors with its top left corner at (x0, y0).
+    # like write_pixel, anything falling outside the canvas is dropped.
+    def write_tile(self, x0, y0, colors):
+        colors = np.asarray(colors, dtype = float)
+        height, width = colors.shape[:2]
+        left, top = max(x0, 0), max(y0, 0)
+        right, bottom = min(x0 + width, self.width), min(y0 + height, self.height)
+        if left >= right or top >= bottom:
+            return
+        self.pixels[top:bottom, left:right] = self.encode(colors[top - y0:bottom - y0, left - x0:right - x0])
+
+    # writes a w x 3 array of colors along row y, starting at column x0
+    def write_scanline(self, y, colors, x0 = 0):
+        self.write_tile(x0, y, np.asarray(colors, dtype = float).reshape(1, -1, 3))
+
+    # replaces every pixel with a height x width x 3 array of colors
+    def write_array(self, colors):
+        colors = np.asarray(colors, dtype = float)
+        if colors.shape != self.pixels.shape:
+            raise ValueError(f"expected colors of shape {self.pixels.shape}, got {colors.shape}")
+        self.pixels[...] = self.encode(colors)
 
     def canvas_to_ppm(self):
-        with open("canvas.ppm", "w") as ppm_file: 
-            ppm_header = ["P3\n", f"{self.width} {self.height}\n", "255\n"]
-            ppm_file.writelines(ppm_header)
-            for y in range(self.height):
-                line = ""
-                for x in range(self.width):
-                    if line != "":
-                        line += " " + self.pixel_at(x, y).ppm_str()
-                    else:
-                        line = self.pixel_at(x, y).ppm_str()
-                # break into 70 character lines
-                while True:
-                    if len(line) is 0:
-                        break
-                    write_line = line[0:70]
-                    # if 70 characters is within a color value, partition at last space before 70 characters
-                    if len(write_line) is 70 and len(line) > 0 and write_line[69] != ' ' and line[0] != ' ':
-                        write_line_partitions = write_line.rpartition(' ')
-                        ppm_file.write(write_line_partitions[0] + "\n")
-                        line = write_line_partitions[2] + line[70:]
-                    else:
-                        ppm_file.write(write_line + "\n")
-                        line = line[70:]
-            ppm_file.write("\n")
+        self.write_ppm("canvas.ppm", "P3")
+
+    # the pixels as 0 to 255 channel values, rounded and clamped as Color.scale_ppm_pixel does
+    def quantize(self):
+        if self.pixels.dtype == np.uint8:
+            return np.array(self.pixels)
+        return Canvas.quantize_colors(self.pixels)
+
+    def quantize_colors(colors):
+        return np.clip(np.rint(np.asarray(colors) * 255), 0, 255).astype(np.uint8)
+
+    # writes the canvas to path as a binary P6 or a plain text P3 image
+    def write_ppm(self, path = "canvas.ppm", format = "P6"):
+        if format == "P6":
+            contents = f"P6\n{self.width} {self.height}\n255\n".encode() + self.quantize().tobytes()
+        elif format == "P3":
+            lines = ["P3", f"{self.width} {self.height}", "255"]
+            for row in self.quantize().reshape(self.height, -1).tolist():
+                lines.extend(Canvas.wrap_ppm_line(" ".join(map(str, row))))
+            contents = ("\n".join(lines) + "\n\n").encode()
+        else:
+            raise ValueError(f"unknown PPM format {format}")
+
+        with open(path, "wb") as ppm_file:
+            ppm_file.write(contents)
+
+    # breaks a row of values into lines of at most 70 characters, splitting at the
+    # last space before the limit when it falls within a value
+    def wrap_ppm_line(line):
+        lines = []
+        start = 0
+        while start < len(line):
+            write_line = line[start:start + 70]
+            if len(write_line) == 70 and write_line[69] != ' ' and line[start] != ' ':
+                end = write_line.rfind(' ')
+                lines.append(write_line[:end])
+                start += end + 1
+            else:
+                lines.append(write_line)
+                start += 70
+        return lines
+
+class PPMStream:
+    # a binary P6 image written a block of rows at a time, so that only the rows
+    # in hand are ever in memory. the header goes out when the stream opens.
+    def __init__(self, path, width, height):
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self.ppm_file = open(path, "wb")
+        self.ppm_file.write(f"P6\n{width} {height}\n255\n".encode())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # appends an h x width x 3 array of colors below the rows already written
+    def write_rows(self, colors):
+        colors = np.asarray(colors, dtype = float).reshape(-1, self.width, 3)
+        if self.rows_written + len(colors) > self.height:
+            raise ValueError(f"{self.rows_written + len(colors)} rows written to an image {self.height} rows high")
+        self.ppm_file.write(Canvas.quantize_colors(colors).tobytes())
+        self.rows_written += len(colors)
+
+    def close(self):
+        self.ppm_file.close()
@@ -1,8 +1,13 @@
 from tuple import Tuple
 
 class Color(Tuple):
+    __slots__ = ()
+
     def __init__(self, red, green, blue):
-        super().__init__(red, green, blue, 0)
+        self.x = red
+        self.y = green
+        self.z = blue
+        self.w = 0
 
     @property
     def red(self):
@@ -17,18 +22,18 @@ class Color(Tuple):
         return self.z
 
     def __add__(self, other):
-        return Color(self.red + other.red, self.green + other.green, self.blue + other.blue)
+        return Color(self.x + other.x, self.y + other.y, self.z + other.z)
 
     def __sub__(self, other):
-        return Color(self.red - other.red, self.green - other.green, self.blue - other.blue)
+        return Color(self.x - other.x, self.y - other.y, self.z - other.z)
 
     def __mul__(self, other):
         # hadamard_product
         # https://stackoverflow.com/questions/4233628/override-mul-from-a-child-class-using-parent-implementation-leads-to-proble/4233800#4233800
         if isinstance(other, Color):
-            return Color(self.red * other.red, self.green * other.green, self.blue * other.blue)
+            return Color(self.x * other.x, self.y * other.y, self.z * other.z)
         else:
-            return Color(self.red * other, self.green * other, self.blue * other)
+            return Color(self.x * other, self.y * other, self.z * other)
 
     def clamp_ppm_pixel(self, pixel):
         if pixel < 0:
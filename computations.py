@@ -2,7 +2,7 @@ from intersection import Intersection
 from ray import Ray
 from shape import Shape
 from tuple import *
-from typing import Iterable
+from typing import Dict, Iterable
 
 class Computations(Intersection):
     def __init__(self, t, object):
@@ -38,26 +38,34 @@ class Computations(Intersection):
         if xs is None:
             xs = [intersection]
         
-        containers: Iterable[Shape] = []
+        # the hit is found by identity; an equal intersection made separately
+        # stands in for it when the hit itself is not in xs
+        target = intersection
+        if not any(i is intersection for i in xs):
+            target = next((i for i in xs if i == intersection), intersection)
+
+        # the objects the ray is inside, innermost last, keyed by identity so that
+        # entering or leaving one is a dict lookup rather than a search with
+        # Shape.__eq__, and so that two equal but separate shapes stay apart
+        containers: Dict[int, Shape] = {}
         for i in xs:
-            if i == intersection:
-                if len(containers) == 0:
-                    comps.n1 = 1.0
-                else:
-                    comps.n1 = containers[-1].material.refractive_index
-            
-            if i.object in containers:
-                containers.remove(i.object)
+            if i is target:
+                comps.n1 = Computations.refractive_index(containers)
+
+            key = id(i.object)
+            if key in containers:
+                del containers[key]
             else:
-                containers.append(i.object)
-            
-            # if i == hit:
-            if i == intersection:
-                if len(containers) == 0:
-                    comps.n2 = 1.0
-                else:
-                    comps.n2 = containers[-1].material.refractive_index
+                containers[key] = i.object
 
+            if i is target:
+                comps.n2 = Computations.refractive_index(containers)
                 break
             
         return comps
+
+    # the refractive index of the innermost of the containers, or of the vacuum
+    def refractive_index(containers: Dict[int, Shape]) -> float:
+        if len(containers) == 0:
+            return 1.0
+        return next(reversed(containers.values())).material.refractive_index
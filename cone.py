@@ -3,7 +3,9 @@ from revolved_plane import RevolvedPlane
 from intersection import Intersection
 from ray import Ray
 from tuple import *
-from typing import Iterable
+from typing import Iterable, Tuple as PythonTuple
+
+import numpy as np
 
 class Cone(RevolvedPlane):
     def __init__(self):
@@ -33,6 +35,28 @@ class Cone(RevolvedPlane):
 
         return xs
 
+    def local_intersect_batch(self, origins: np.ndarray, directions: np.ndarray) -> PythonTuple[np.ndarray, None, None]:
+        a = directions[:, 0] ** 2 - directions[:, 1] ** 2 + directions[:, 2] ** 2
+        b = 2 * origins[:, 0] * directions[:, 0] - 2 * origins[:, 1] * directions[:, 1] + 2 * origins[:, 2] * directions[:, 2]
+        c = origins[:, 0] ** 2 - origins[:, 1] ** 2 + origins[:, 2] ** 2
+
+        # rays with both a and b near zero miss the cone entirely, caps included
+        flat_a = np.abs(a) < Constants.epsilon
+        flat_b = np.abs(b) < Constants.epsilon
+        misses = flat_a & flat_b
+
+        wall_ts = self.find_intersections_batch(origins, directions, a, b, c, ~flat_a)
+
+        # rays parallel to one of the cone's halves hit the wall once
+        single = flat_a & ~flat_b
+        wall_ts[single, 0] = -c[single] / (2 * b[single])
+
+        cap_ts = self.intersect_caps_batch(origins, directions, self.minimum, self.maximum)
+
+        ts = np.hstack((wall_ts, cap_ts))
+        ts[misses] = math.inf
+        return ts, None, None
+
     def local_normal_at_wall(self, local_point: Point) -> Vector:
             y = math.sqrt(local_point.x ** 2 + local_point.z ** 2)
             if local_point.y > 0:
@@ -1,3 +1,7 @@
 class Constants:
     epsilon = 0.0001
-    
\ No newline at end of file
+
+    # relative costs of testing a ray against a bounding box and against a
+    # primitive, used to estimate bounding volume hierarchy traversal cost
+    bvh_traversal_cost = 1.0
+    bvh_intersection_cost = 1.0
@@ -1,11 +1,12 @@
 
 from bounds import Bounds
 from group import Group
+from instance import Instance, InstancedShape
 from intersection import Intersection
 from ray import Ray
 from shape import Shape
 from tuple import *
-from typing import List
+from typing import List, Set
 
 
 class CSG(Shape):
@@ -16,6 +17,8 @@ class CSG(Shape):
         self.left.parent = self
         self.right: Shape = right
         self.right.parent = self
+        self.bounds: Bounds = None
+        self.left_ids: Set[int] = None
 
     def __eq__(self, other):
         return super().__eq__(other) and self.operation == other.operation and self.left == other.left and self.right == other.right
@@ -37,9 +40,13 @@ class CSG(Shape):
         # prepare a list to receive the filtered intersections
         result = []
 
+        left_ids = csg.left_members()
         for intersection in xs:
             # if i.object is part of the "left" child, then lhit is true
-            lhit = CSG.includes(csg.left, intersection.object)
+            object = intersection.object
+            if isinstance(object, InstancedShape):
+                object = object.instance
+            lhit = id(object) in left_ids
 
             if CSG.intersection_allowed(csg.operation, lhit, inl, inr):
                 result.append(intersection)
@@ -60,36 +67,99 @@ class CSG(Shape):
             return False
         if isinstance(a, CSG):
             return CSG.includes(a.left, b) or CSG.includes(a.right, b)
+        if isinstance(a, Instance):
+            return isinstance(b, InstancedShape) and b.instance is a
         if isinstance(a, Shape):
             return a == b
 
+    # the identities of every shape a hit on the left operand can point at: its
+    # leaves, with instances standing for the shapes of their prototypes. built
+    # on first use and dropped whenever the tree below the CSG changes.
+    def left_members(self) -> Set[int]:
+        if self.left_ids is None:
+            self.left_ids = CSG.member_ids(self.left)
+        return self.left_ids
+
+    def member_ids(shape: Shape) -> Set[int]:
+        ids = set()
+        stack = [shape]
+        while stack:
+            shape = stack.pop()
+            if isinstance(shape, Group):
+                stack.extend(shape.members)
+            elif isinstance(shape, CSG):
+                stack.extend([shape.left, shape.right])
+            else:
+                ids.add(id(shape))
+        return ids
+
     def local_intersect(self, ray: Ray) -> List[Intersection]:
         bounds = self.bounds_of()
         if bounds.intersects(ray):
             leftxs = self.left.intersect(ray)
+            # nothing survives an intersection or a difference unless the ray hits
+            # the left operand, nor an intersection unless it hits the right one
+            if len(leftxs) == 0 and self.operation != "union":
+                return []
             rightxs = self.right.intersect(ray)
+            if len(rightxs) == 0 and self.operation == "intersection":
+                return []
 
-            xs = list(leftxs + rightxs)
+            xs = list(leftxs) + list(rightxs)
             xs.sort(key = lambda intersection: intersection.t)
 
             return CSG.filter_intersections(self, xs)
         else:
             return []
 
+    # every surviving hit is a hit on one of the children, so two cheap any-hit
+    # queries reject most rays before the filtered list has to be built
+    def local_occluded(self, ray: Ray, distance: float) -> bool:
+        if not self.bounds_of().intersects(ray):
+            return False
+        if not self.left.occluded(ray, distance) and not self.right.occluded(ray, distance):
+            return False
+
+        for intersection in self.local_intersect(ray):
+            if 0 <= intersection.t < distance:
+                return True
+        return False
+
     def local_normal_at(self, local_point: Point, intersection: Intersection) -> Vector:
         pass
 
     def bounds_of(self) -> Bounds:
-        box = Bounds()
+        # cached until either child changes. an intersection lies within the
+        # overlap of its operands and a difference within its left operand.
+        if self.bounds is None:
+            box = Bounds()
+
+            left_cbox = self.left.parent_space_bounds_of()
+            if self.operation == "intersection":
+                box.add_box(left_cbox.overlap(self.right.parent_space_bounds_of()))
+            elif self.operation == "difference":
+                box.add_box(left_cbox)
+            else:
+                box.add_box(left_cbox)
+                box.add_box(self.right.parent_space_bounds_of())
 
-        left_cbox = self.left.parent_space_bounds_of()
-        right_cbox = self.right.parent_space_bounds_of()
+            self.bounds = box
 
-        box.add_box(left_cbox)
-        box.add_box(right_cbox)
+        return self.bounds
 
-        return box
+    def invalidate_bounds(self) -> None:
+        self.bounds = None
+        self.left_ids = None
+        super().invalidate_bounds()
 
     def divide(self, threshold: int) -> None:
         self.left.divide(threshold)
         self.right.divide(threshold)
+
+    def divide_sah(self, leaf_size: int = 4, bins: int = 12) -> None:
+        self.left.divide_sah(leaf_size, bins)
+        self.right.divide_sah(leaf_size, bins)
+
+    # both operands are intersected whenever the CSG's box is hit
+    def expected_cost(self) -> float:
+        return Constants.bvh_traversal_cost + self.left.expected_cost() + self.right.expected_cost()
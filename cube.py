@@ -1,3 +1,6 @@
+import math
+import numpy as np
+
 from bounds import Bounds
 from intersection import Intersection
 from ray import Ray
@@ -25,6 +28,20 @@ class Cube(Shape):
         
         return [Intersection(tmin, self), Intersection(tmax, self)]
 
+    def local_intersect_batch(self, origins: np.ndarray, directions: np.ndarray) -> PythonTuple[np.ndarray, None, None]:
+        xtmin, xtmax = Cube.check_axis_batch(origins[:, 0], directions[:, 0])
+        ytmin, ytmax = Cube.check_axis_batch(origins[:, 1], directions[:, 1])
+        ztmin, ztmax = Cube.check_axis_batch(origins[:, 2], directions[:, 2])
+
+        tmin = np.maximum(np.maximum(xtmin, ytmin), ztmin)
+        tmax = np.minimum(np.minimum(xtmax, ytmax), ztmax)
+        hit = tmin <= tmax
+
+        t = np.full((len(origins), 2), math.inf)
+        t[hit, 0] = tmin[hit]
+        t[hit, 1] = tmax[hit]
+        return t, None, None
+
     def local_normal_at(self, local_point: Point = None, intersection: Intersection = None) -> Vector:
         maxc = max([abs(local_point.x), abs(local_point.y), abs(local_point.z)])
 
@@ -42,14 +59,28 @@ class Cube(Shape):
             tmin = tmin_numerator / direction
             tmax = tmax_numerator / direction
         else:
-            tmin = tmin_numerator * math.inf
-            tmax = tmax_numerator * math.inf
+            # a parallel ray runs inside the slab, faces included, or misses
+            # it. an origin on a face would make numerator * inf a nan
+            tmin = -math.inf if tmin_numerator <= 0 else math.inf
+            tmax = math.inf if tmax_numerator >= 0 else -math.inf
 
         if tmin > tmax:
             tmin, tmax = tmax, tmin
 
         return tmin, tmax
 
+    # check_axis for arrays of ray origin and direction components
+    def check_axis_batch(origin: np.ndarray, direction: np.ndarray, min_axis_value: float = -1, max_axis_value: float = 1) -> PythonTuple[np.ndarray, np.ndarray]:
+        tmin_numerator = (min_axis_value - origin)
+        tmax_numerator = (max_axis_value - origin)
+
+        parallel = np.abs(direction) < Constants.epsilon
+        divisor = np.where(parallel, 1, direction)
+        tmin = np.where(parallel, np.where(tmin_numerator <= 0, -math.inf, math.inf), tmin_numerator / divisor)
+        tmax = np.where(parallel, np.where(tmax_numerator >= 0, math.inf, -math.inf), tmax_numerator / divisor)
+
+        return np.minimum(tmin, tmax), np.maximum(tmin, tmax)
+
     def bounds_of(self) -> Bounds:
         min = Point(-1, -1, -1)
         max = Point(1, 1, 1)
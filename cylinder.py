@@ -3,7 +3,9 @@ from intersection import Intersection
 from ray import Ray
 from revolved_plane import RevolvedPlane
 from tuple import *
-from typing import Iterable
+from typing import Iterable, Tuple as PythonTuple
+
+import numpy as np
 
 class Cylinder(RevolvedPlane):
     def __init__(self):
@@ -30,6 +32,20 @@ class Cylinder(RevolvedPlane):
 
         return xs
 
+    def local_intersect_batch(self, origins: np.ndarray, directions: np.ndarray) -> PythonTuple[np.ndarray, None, None]:
+        a = directions[:, 0] ** 2 + directions[:, 2] ** 2
+
+        # rays parallel to the y axis can only hit the caps
+        walls = a >= Constants.epsilon
+
+        b = 2 * origins[:, 0] * directions[:, 0] + 2 * origins[:, 2] * directions[:, 2]
+        c = origins[:, 0] ** 2 + origins[:, 2] ** 2 - 1
+
+        wall_ts = self.find_intersections_batch(origins, directions, a, b, c, walls)
+        cap_ts = self.intersect_caps_batch(origins, directions, 1, 1)
+
+        return np.hstack((wall_ts, cap_ts)), None, None
+
     def local_normal_at_wall(self, local_point: Point = None) -> Vector:
         return Vector(local_point.x, 0, local_point.z)
     
@@ -1,19 +1,27 @@
+import math
+
 from bounds import Bounds
 from intersection import Intersection
 from ray import Ray
 from shape import Shape
 from tuple import *
-from typing import Iterable, List
+from typing import Iterable, List, Tuple as PythonTuple
 
 class Group(Shape):
     def __init__(self):
         super().__init__()
         self.members: List[Shape] = []
+        self.bounds: Bounds = None
+        self.member_bounds: List[Bounds] = None
+        self.bvh: 'BVH' = None
     
     def __eq__(self, other):
         return super().__eq__(other) and self.members == other.members
 
     def local_intersect(self, ray: Ray) -> Iterable[Intersection]:
+        if self.bvh is not None:
+            return self.bvh.intersect(ray)
+
         bounds = self.bounds_of()
         if bounds.intersects(ray):
             xs = []
@@ -24,20 +32,77 @@ class Group(Shape):
         else:
             return []
 
+    # visits the children whose boxes the ray enters, nearest box first, and
+    # skips any box that starts beyond the closest hit found so far
+    def local_intersect_closest(self, ray: Ray, t_max: float) -> Intersection:
+        if self.bvh is not None:
+            return self.bvh.intersect_closest(ray, t_max)
+
+        if not self.bounds_of().intersects(ray):
+            return None
+
+        candidates = []
+        for member, box in zip(self.members, self.member_bounds):
+            tmin, tmax = box.intersect_distances(ray)
+            if tmin <= tmax and tmax >= 0 and tmin < t_max:
+                candidates.append((tmin, member))
+        candidates.sort(key = lambda candidate: candidate[0])
+
+        closest = None
+        for entry, member in candidates:
+            if entry >= t_max:
+                break
+            hit = member.intersect_closest(ray, t_max)
+            if hit is not None:
+                closest = hit
+                t_max = hit.t
+
+        return closest
+
+    # stops at the first child that blocks the ray, without collecting or sorting
+    def local_occluded(self, ray: Ray, distance: float) -> bool:
+        if self.bvh is not None:
+            return self.bvh.occluded(ray, distance)
+
+        if self.bounds_of().intersects(ray):
+            for member in self.members:
+                if member.occluded(ray, distance):
+                    return True
+
+        return False
+
     def local_normal_at(self, local_point: Point = None) -> Vector:
         raise Exception("Group.local_normal_at should not be called. Group is abstract, use concrete shapes' local_normal_at")
 
     def add_child(self, shape: Shape) -> None:
         shape.parent = self
         self.members.append(shape)
+        self.invalidate_bounds()
 
     def bounds_of(self) -> Bounds:
-        box = Bounds()
-        for child in self.members:
-            cbox = child.parent_space_bounds_of()
-            box.add_box(cbox)
+        # cached until a child is added, moved or regrouped
+        if self.bounds is None:
+            box = Bounds()
+            self.member_bounds = [child.parent_space_bounds_of() for child in self.members]
+            for cbox in self.member_bounds:
+                box.add_box(cbox)
+            self.bounds = box
+
+        return self.bounds
+
+    def invalidate_bounds(self) -> None:
+        self.bounds = None
+        self.member_bounds = None
+        self.bvh = None
+        super().invalidate_bounds()
+
+    # compiles the hierarchy below this group into a flat, array-backed BVH that
+    # is traversed without recursion. call it after divide or divide_sah; any
+    # later change to the subtree drops the BVH again.
+    def flatten(self) -> None:
+        from bvh import BVH
 
-        return box
+        self.bvh = BVH.from_group(self)
 
     def divide(self, threshold):
         if threshold <= len(self.members):
@@ -66,6 +131,7 @@ class Group(Shape):
             else:
                 other_members.append(member)
         self.members = other_members
+        self.invalidate_bounds()
         return (left_group_members, right_group_members)
 
     def make_subgroup(self, subgroup_members: List[Shape]) -> None:
@@ -86,3 +152,95 @@ class Group(Shape):
 
         for child in self.members:
             child.divide(threshold)
+
+    # builds a bounding volume hierarchy with the binned surface area heuristic.
+    # children are binned by the centroids of their boxes along each axis, and the
+    # group is split at the bin boundary with the lowest expected cost until no
+    # more than leaf_size children remain in a group.
+    def divide_sah(self, leaf_size: int = 4, bins: int = 12) -> None:
+        self.bounds_of()
+
+        # children with infinite boxes can't be binned, so they stay here. no ray
+        # hits a child with an empty box, so it goes down with the left subgroup,
+        # whose box it leaves as it is
+        bounded = [(member, box) for member, box in zip(self.members, self.member_bounds) if box.is_finite()]
+        empty = [member for member, box in zip(self.members, self.member_bounds) if box.is_empty()]
+        unbounded = [member for member, box in zip(self.members, self.member_bounds) if not box.is_finite() and not box.is_empty()]
+        if len(bounded) > leaf_size:
+            split = Group.sah_split(bounded, bins)
+            if split is not None:
+                (left, right) = split
+                self.members = unbounded
+                self.invalidate_bounds()
+                self.make_subgroup(left + empty)
+                self.make_subgroup(right)
+
+        for child in self.members:
+            child.divide_sah(leaf_size, bins)
+
+    # returns the (left, right) children of the cheapest split, or None when
+    # every centroid falls in the same place
+    def sah_split(members: List[PythonTuple[Shape, Bounds]], bins: int) -> PythonTuple[List[Shape], List[Shape]]:
+        parent_box = Bounds()
+        centroid_box = Bounds()
+        centroids = []
+        for _, box in members:
+            parent_box.add_box(box)
+            centroid = box.centroid()
+            centroid_box.add_point(centroid)
+            centroids.append(centroid)
+        parent_area = parent_box.surface_area()
+        # the boxes all lie on one line, which has no area to weigh a split by
+        if parent_area == 0:
+            return None
+
+        best = None
+        for axis in ('x', 'y', 'z'):
+            axis_min = getattr(centroid_box.min, axis)
+            extent = getattr(centroid_box.max, axis) - axis_min
+            if extent <= 0:
+                continue
+
+            indices = [min(bins - 1, int(bins * (getattr(centroid, axis) - axis_min) / extent)) for centroid in centroids]
+            bin_boxes = [Bounds() for _ in range(bins)]
+            bin_counts = [0] * bins
+            for index, (_, box) in zip(indices, members):
+                bin_boxes[index].add_box(box)
+                bin_counts[index] += 1
+
+            for split in range(1, bins):
+                left_box = Bounds()
+                right_box = Bounds()
+                for index in range(split):
+                    left_box.add_box(bin_boxes[index])
+                for index in range(split, bins):
+                    right_box.add_box(bin_boxes[index])
+                left_count = sum(bin_counts[:split])
+                right_count = len(members) - left_count
+                if left_count == 0 or right_count == 0:
+                    continue
+
+                cost = Constants.bvh_traversal_cost + Constants.bvh_intersection_cost * (left_box.surface_area() * left_count + right_box.surface_area() * right_count) / parent_area
+                if best is None or cost < best[0]:
+                    best = (cost, indices, split)
+
+        if best is None:
+            return None
+
+        (_, indices, split) = best
+        left = [member for index, (member, _) in zip(indices, members) if index < split]
+        right = [member for index, (member, _) in zip(indices, members) if index >= split]
+        return (left, right)
+
+    # the expected cost of intersecting a ray that hits this group's box, in units
+    # of Constants.bvh_traversal_cost and bvh_intersection_cost. every child's box
+    # is tested, and each child is entered with the chance that a ray through this
+    # group's box also passes through the child's box.
+    def expected_cost(self) -> float:
+        area = self.bounds_of().surface_area()
+        cost = 0.0
+        for member, box in zip(self.members, self.member_bounds):
+            probability = box.surface_area() / area if 0 < area < math.inf else 1
+            cost += Constants.bvh_traversal_cost + probability * member.expected_cost()
+
+        return cost
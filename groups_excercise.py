@@ -4,6 +4,7 @@ from camera import Camera
 from color import Color
 from cylinder import Cylinder
 from group import Group
+from instance import Instance
 from light import PointLight
 from sphere import Sphere
 from transformations import Transformations
@@ -30,11 +31,13 @@ def hexagon_side() -> Group:
     return side
 
 def hexagon() -> Group:
+    # the six sides are instances of one side's shapes
+    side = hexagon_side()
     hex = Group()
     for n in range(6):
-        side = hexagon_side()
-        side.transform = Transformations.rotation_y(n * math.pi / 3)
-        hex.add_child(side)
+        instance = Instance(side)
+        instance.transform = Transformations.rotation_y(n * math.pi / 3)
+        hex.add_child(instance)
 
     return hex
 
@@ -0,0 +1,130 @@
+import numpy as np
+
+from bounds import Bounds
+from intersection import Intersection
+from material import Material
+from matrix import Matrix
+from ray import Ray
+from shape import Shape
+from tuple import *
+from typing import Iterable, List
+
+class Instance(Shape):
+    # places a shared Group, TriangleMesh or BVH, the prototype, with a transform
+    # of its own. the prototype is never copied or reparented, so any number of
+    # instances cost one shape each and all use its acceleration structure. a
+    # material given here, the override_material, replaces the materials of the
+    # prototype's shapes; without one they keep their own. the instance's own
+    # material is left as every Shape has it.
+    def __init__(self, prototype, material: Material = None):
+        super().__init__()
+        self.prototype = prototype
+        self.override_material: Material = material
+        # the InstancedShape standing for each shape of the prototype hit so far
+        self.instanced_shapes: dict = {}
+        Instance.listen(self)
+
+    # a prototype has no parent, so the instances placing it are among its
+    # owners, and hear when its box changes
+    def listen(self) -> None:
+        if isinstance(self.prototype, Shape):
+            self.prototype.owners.append(self)
+
+    def changed(self) -> None:
+        self.bounds_changed()
+
+    # pickled prototypes forget their owners, so an unpickled instance
+    # registers itself again
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        Instance.listen(self)
+
+    def __eq__(self, other):
+        return type(self) == type(other) and self.prototype is other.prototype and np.array_equal(self.transform, other.transform) and self.material == other.material and self.override_material == other.override_material
+
+    # the intersection re-pointed at the InstancedShape of the shape that was hit
+    def instanced(self, intersection: Intersection) -> Intersection:
+        shape = self.instanced_shapes.get(id(intersection.object))
+        if shape is None:
+            shape = InstancedShape(self, intersection.object)
+            self.instanced_shapes[id(intersection.object)] = shape
+        return Intersection(intersection.t, shape, intersection.u, intersection.v, intersection.face)
+
+    def local_intersect(self, ray: Ray) -> Iterable[Intersection]:
+        return [self.instanced(intersection) for intersection in self.prototype.intersect(ray)]
+
+    def local_intersect_closest(self, ray: Ray, t_max: float) -> Intersection:
+        hit = self.prototype.intersect_closest(ray, t_max)
+        return None if hit is None else self.instanced(hit)
+
+    def local_occluded(self, ray: Ray, distance: float) -> bool:
+        return self.prototype.occluded(ray, distance)
+
+    def local_normal_at(self, local_point: Point, intersection: Intersection = None) -> Vector:
+        raise Exception("Instance.local_normal_at should not be called. Hits on an instance are on the InstancedShape of the shape that was hit")
+
+    # a BVH prototype traces rays in its root shape's object space, but the
+    # shapes it hits convert points and normals through the transforms of that
+    # shape and its parents too. these are the shapes whose transforms the
+    # InstancedShape undoes, the root shape first
+    def root_chain(self) -> List[Shape]:
+        from bvh import BVH
+
+        chain = []
+        if isinstance(self.prototype, BVH):
+            shape = self.prototype.root_shape
+            while shape is not None:
+                if not shape.identity_transform:
+                    chain.append(shape)
+                shape = shape.parent
+        return chain
+
+    def bounds_of(self) -> Bounds:
+        from bvh import BVH
+
+        if isinstance(self.prototype, BVH):
+            box = self.prototype.node_box_list[0]
+            return Bounds(Point(box[0], box[1], box[2]), Point(box[3], box[4], box[5]))
+        return self.prototype.parent_space_bounds_of()
+
+    # an instance costs what its prototype does. Shape.divide leaves the shared
+    # prototype alone: it is divided once by whoever built it, not per instance
+    def expected_cost(self) -> float:
+        if isinstance(self.prototype, Shape):
+            return self.prototype.expected_cost()
+        return Constants.bvh_intersection_cost
+
+class InstancedShape:
+    # a shape of an instance's prototype as that instance places it: the object
+    # of every intersection with the instance, which shading asks for the
+    # normal, material and pattern space. one exists per instance and shape hit,
+    # so hits on the same surface through the same instance are the same object.
+    def __init__(self, instance: Instance, shape):
+        self.instance: Instance = instance
+        self.shape = shape
+
+    @property
+    def material(self) -> Material:
+        if self.instance.override_material is not None:
+            return self.instance.override_material
+        return self.shape.material
+
+    # the prototype's space is the instance's object space. the point is taken
+    # out of it through the transforms the shape will apply again
+    def prototype_point(self, point: Point, chain: List[Shape]) -> Point:
+        point = self.instance.world_to_object(point)
+        for shape in chain:
+            point = Matrix.multiply_tuple(shape.transform_rows, point)
+        return point
+
+    def world_to_object(self, point: Point) -> Point:
+        return self.shape.world_to_object(InstancedShape.prototype_point(self, point, Instance.root_chain(self.instance)))
+
+    def normal_at(self, point: Point, intersection: Intersection = None) -> Vector:
+        chain = Instance.root_chain(self.instance)
+        normal = self.shape.normal_at(InstancedShape.prototype_point(self, point, chain), intersection)
+        # normals turn by the inverse transpose, so the transpose turns them back
+        for shape in reversed(chain):
+            normal = Matrix.multiply_tuple(shape.transform.transpose(), normal)
+            normal.w = 0
+        return self.instance.normal_to_world(normal)
@@ -1,11 +1,13 @@
 from typing import Iterable
 
 class Intersection:
-    def __init__(self, t: float, object, u: float = None, v: float = None):
+    def __init__(self, t: float, object, u: float = None, v: float = None, face: int = None):
         self.t: float = t
         self.object = object
         self.u: float = u
         self.v: float = v
+        # which triangle of a TriangleMesh was hit
+        self.face: int = face
     
     def intersections(*i: Iterable['Intersection']) -> Iterable['Intersection']:
         return i
@@ -19,5 +21,7 @@ class Intersection:
         return hit
 
     def __eq__(self, other):
+        if self is other:
+            return True
         return self.t == other.t and self.object == other.object
                 
\ No newline at end of file
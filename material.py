@@ -13,5 +13,5 @@ class Material:
         self.refractive_index = 1.0
 
     def __eq__(self, other):
-        return self.color == other.color and self.ambient == other.ambient and self.diffuse == other.diffuse and self.specular == other.specular and self.shininess == other.shininess and self.pattern == other.pattern and self.reflective == other.reflective and self.transparency == other.transparency and self.refractive_index == other.refractive_index
+        return type(self) == type(other) and self.color == other.color and self.ambient == other.ambient and self.diffuse == other.diffuse and self.specular == other.specular and self.shininess == other.shininess and self.pattern == other.pattern and self.reflective == other.reflective and self.transparency == other.transparency and self.refractive_index == other.refractive_index
         
\ No newline at end of file
@@ -4,13 +4,35 @@ from constants import Constants
 from tuple import Tuple
 
 class Matrix:
-    def multiply_tuple(matrix: np.ndarray, tuple: Tuple):
-        x = matrix[0][0] * tuple.x + matrix[0][1] * tuple.y + matrix[0][2] * tuple.z + matrix[0][3] * tuple.w
-        y = matrix[1][0] * tuple.x + matrix[1][1] * tuple.y + matrix[1][2] * tuple.z + matrix[1][3] * tuple.w
-        z = matrix[2][0] * tuple.x + matrix[2][1] * tuple.y + matrix[2][2] * tuple.z + matrix[2][3] * tuple.w
-        w = matrix[3][0] * tuple.x + matrix[3][1] * tuple.y + matrix[3][2] * tuple.z + matrix[3][3] * tuple.w
-        t = Tuple(x, y, z, w)
-        return t
+    # the rows of the matrix as plain floats, which are far cheaper to index and
+    # multiply than NumPy scalars. multiply_tuple accepts these in place of the array.
+    def rows(matrix: np.ndarray) -> list:
+        return matrix.tolist()
+
+    def multiply_tuple(matrix, tuple: Tuple) -> Tuple:
+        rows = matrix.tolist() if isinstance(matrix, np.ndarray) else matrix
+        (m00, m01, m02, m03), (m10, m11, m12, m13), (m20, m21, m22, m23), bottom = rows
+        tx, ty, tz, tw = tuple.x, tuple.y, tuple.z, tuple.w
+        x = m00 * tx + m01 * ty + m02 * tz + m03 * tw
+        y = m10 * tx + m11 * ty + m12 * tz + m13 * tw
+        z = m20 * tx + m21 * ty + m22 * tz + m23 * tw
+        # an affine matrix, one whose bottom row is 0 0 0 1, carries w through unchanged
+        if bottom == [0, 0, 0, 1]:
+            w = tw
+        else:
+            w = bottom[0] * tx + bottom[1] * ty + bottom[2] * tz + bottom[3] * tw
+        return Tuple.math_type(x, y, z, w)
+
+    # transforms every row of an N x 4 array of points and vectors at once,
+    # again leaving w alone when the matrix is affine
+    def multiply_points(matrix: np.ndarray, points: np.ndarray) -> np.ndarray:
+        points = np.asarray(points, dtype = float)
+        if np.array_equal(matrix[3], [0, 0, 0, 1]):
+            result = np.empty_like(points)
+            result[:, :3] = points.dot(matrix[:3].transpose())
+            result[:, 3] = points[:, 3]
+            return result
+        return points.dot(matrix.transpose())
 
     def determinant(matrix: np.ndarray):
         return np.linalg.det(matrix)
@@ -37,4 +59,66 @@ class Matrix:
             
     def inverse(matrix: np.ndarray) -> np.ndarray:
         return np.linalg.inv(matrix)
-    
\ No newline at end of file
+    
+class Transformable:
+    # transform is a managed property: assigning it drops the cached inverse and
+    # inverse transpose, which are then computed once on first use. Reassign the
+    # matrix rather than mutating it in place so the caches stay valid.
+    @property
+    def transform(self) -> np.ndarray:
+        return self._transform
+
+    @transform.setter
+    def transform(self, transform: np.ndarray) -> None:
+        self._transform = transform
+        self._inverse_transform = None
+        self._inverse_transpose = None
+        self._inverse_rows = None
+        self._inverse_transpose_rows = None
+        self._transform_rows = None
+        self.similarity = False
+        self.identity_transform = np.array_equal(transform, np.identity(4))
+        self.transform_changed()
+
+    # assigns a transform whose inverse is already known, such as one made by a
+    # TransformBuilder, so that it is never inverted numerically. similarity marks
+    # a transform made only of rotations, translations and uniform scales.
+    def set_transform(self, transform: np.ndarray, inverse_transform: np.ndarray, similarity: bool = False) -> None:
+        self.transform = transform
+        self._inverse_transform = inverse_transform
+        self.similarity = similarity
+
+    # hook for subclasses that derive state from the transform
+    def transform_changed(self) -> None:
+        pass
+
+    @property
+    def inverse_transform(self) -> np.ndarray:
+        if self._inverse_transform is None:
+            self._inverse_transform = Matrix.inverse(self._transform)
+        return self._inverse_transform
+
+    @property
+    def inverse_transpose(self) -> np.ndarray:
+        if self._inverse_transpose is None:
+            self._inverse_transpose = self.inverse_transform.transpose()
+        return self._inverse_transpose
+
+    # the transform, inverse and inverse transpose as Matrix.rows, for multiply_tuple
+    @property
+    def transform_rows(self) -> list:
+        if self._transform_rows is None:
+            self._transform_rows = Matrix.rows(self._transform)
+        return self._transform_rows
+
+    @property
+    def inverse_rows(self) -> list:
+        if self._inverse_rows is None:
+            self._inverse_rows = Matrix.rows(self.inverse_transform)
+        return self._inverse_rows
+
+    @property
+    def inverse_transpose_rows(self) -> list:
+        if self._inverse_transpose_rows is None:
+            self._inverse_transpose_rows = Matrix.rows(self.inverse_transpose)
+        return self._inverse_transpose_rows
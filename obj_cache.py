@@ -0,0 +1,129 @@
+import hashlib
+import json
+import numpy as np
+import os
+
+from group import Group
+from obj_file import ObjFile
+from triangle_mesh import TriangleMesh
+
+class ObjCache:
+    # bumped whenever the layout of an entry changes
+    version: int = 1
+
+    # parses an OBJ file in mesh mode, dividing each mesh with threshold when
+    # one is given, or loads the result of an earlier call from cache_dir. an
+    # entry is a directory of .npy arrays, which are memory mapped on load,
+    # and a manifest recording the source's size, mtime and content hash. the
+    # content is only hashed when the size or mtime no longer match.
+    def load(filepath: str, cache_dir: str = None, threshold: int = None) -> ObjFile:
+        filepath = os.path.abspath(filepath)
+        directory = ObjCache.entry_directory(filepath, cache_dir)
+        status = os.stat(filepath)
+        manifest = ObjCache.read_manifest(directory)
+
+        if manifest is not None and manifest['threshold'] == threshold:
+            if manifest['size'] == status.st_size and manifest['mtime_ns'] == status.st_mtime_ns:
+                return ObjCache.read(directory, manifest)
+
+            content_hash = ObjCache.content_hash(filepath)
+            if manifest['hash'] == content_hash:
+                # touched but unchanged
+                manifest['size'] = status.st_size
+                manifest['mtime_ns'] = status.st_mtime_ns
+                ObjCache.write_manifest(directory, manifest)
+                return ObjCache.read(directory, manifest)
+        else:
+            content_hash = ObjCache.content_hash(filepath)
+
+        objFile = ObjFile.parse_obj_file_chunked(filepath, mesh = True)
+        if threshold is not None:
+            for group in [objFile.default_group] + list(objFile.named_groups.values()):
+                for member in group.members:
+                    member.divide(threshold)
+
+        manifest = {'version': ObjCache.version, 'path': filepath, 'size': status.st_size, 'mtime_ns': status.st_mtime_ns,
+                    'hash': content_hash, 'threshold': threshold}
+        ObjCache.write(objFile, directory, manifest)
+        return objFile
+
+    # entries default to an __objcache__ directory beside the source file
+    def entry_directory(filepath: str, cache_dir: str = None) -> str:
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(filepath), '__objcache__')
+        path_hash = hashlib.sha1(filepath.encode()).hexdigest()[:16]
+        return os.path.join(cache_dir, os.path.basename(filepath) + '-' + path_hash)
+
+    def content_hash(filepath: str) -> str:
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as source:
+            for block in iter(lambda: source.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def read_manifest(directory: str) -> dict:
+        try:
+            with open(os.path.join(directory, 'manifest.json')) as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+
+        return manifest if manifest.get('version') == ObjCache.version else None
+
+    def write_manifest(directory: str, manifest: dict) -> None:
+        # written to the side and moved into place, so that readers never see half a manifest
+        path = os.path.join(directory, 'manifest.json')
+        with open(path + '.tmp', 'w') as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.replace(path + '.tmp', path)
+
+    def read(directory: str, manifest: dict) -> ObjFile:
+        def load_array(name: str) -> np.ndarray:
+            return np.load(os.path.join(directory, name + '.npy'), mmap_mode = 'r')
+
+        objFile = ObjFile()
+        objFile.ignored_lines = manifest['ignored_lines']
+        objFile.vertex_array = load_array('vertices')
+        objFile.normal_array = load_array('normals')
+        for entry in manifest['groups']:
+            if entry['name'] is None:
+                group = objFile.default_group
+            else:
+                group = Group()
+                objFile.named_groups[entry['name']] = group
+
+            if entry['mesh'] is not None:
+                prefix = 'mesh' + str(entry['mesh']) + '_'
+                arrays = {name: load_array(prefix + name) for name in entry['arrays']}
+                group.add_child(TriangleMesh.from_arrays(objFile.vertex_array, objFile.normal_array, arrays))
+
+        return objFile
+
+    # the manifest goes last and only once every array is in place, so an
+    # interrupted write leaves no entry rather than a broken one
+    def write(objFile: ObjFile, directory: str, manifest: dict) -> None:
+        os.makedirs(directory, exist_ok = True)
+        try:
+            os.remove(os.path.join(directory, 'manifest.json'))
+        except FileNotFoundError:
+            pass
+
+        np.save(os.path.join(directory, 'vertices.npy'), objFile.vertex_array)
+        np.save(os.path.join(directory, 'normals.npy'), objFile.normal_array)
+
+        groups = []
+        named = [(None, objFile.default_group)] + list(objFile.named_groups.items())
+        for name, group in named:
+            meshes = [member for member in group.members if isinstance(member, TriangleMesh)]
+            entry = {'name': name, 'mesh': None}
+            if meshes:
+                entry['mesh'] = len(groups)
+                arrays = meshes[0].mesh_arrays()
+                for array_name, array in arrays.items():
+                    np.save(os.path.join(directory, 'mesh' + str(entry['mesh']) + '_' + array_name + '.npy'), array)
+                entry['arrays'] = list(arrays)
+            groups.append(entry)
+
+        manifest['ignored_lines'] = objFile.ignored_lines
+        manifest['groups'] = groups
+        ObjCache.write_manifest(directory, manifest)
@@ -1,7 +1,10 @@
+import numpy as np
+
 from smooth_triangle import SmoothTriangle
 from group import Group
+from triangle_mesh import TriangleMesh
 from tuple import Point, Vector
-from typing import Iterable
+from typing import Iterable, List, Tuple as PythonTuple
 
 class ObjFile:
     def __init__(self):
@@ -10,8 +13,13 @@ class ObjFile:
         self.default_group: Group = Group()
         self.named_groups = {}
         self.normals: Iterable[Vector] = [None]
+        # faces of each group (None for the default group) in mesh mode, as
+        # (vertex indices, normal indices) pairs
+        self.mesh_faces = {}
 
-    def parse_obj_file(filepath: str) -> int:
+    # with mesh=True each group receives a single TriangleMesh holding all of its
+    # faces, instead of one Triangle or SmoothTriangle per face
+    def parse_obj_file(filepath: str, mesh: bool = False) -> 'ObjFile':
         objFile = ObjFile()
         with open(filepath, "r") as obj_file:
             group_name = None
@@ -19,6 +27,8 @@ class ObjFile:
                 tokens = line.split()
                 if len(tokens) == 4 and tokens[0] == 'v':
                     objFile.vertices.append(Point(float(tokens[1]), float(tokens[2]), float(tokens[3])))
+                elif len(tokens) >= 4 and tokens[0] == 'f' and mesh:
+                    objFile.mesh_faces.setdefault(group_name, []).extend(ObjFile.fan_triangulation_indices(tokens, len(objFile.vertices) - 1, len(objFile.normals) - 1))
                 elif len(tokens) >= 4 and tokens[0] == 'f':
                     for triangle in ObjFile.fan_triangulation(objFile.vertices, objFile.normals, tokens):
                         if group_name:
@@ -32,9 +42,228 @@ class ObjFile:
                     objFile.normals.append(Vector(float(tokens[1]), float(tokens[2]), float(tokens[3])))
                 else:
                     objFile.ignored_lines += 1
-        
+
+        if mesh:
+            objFile.build_meshes()
+
+        return objFile
+
+    # the zero-based position of a one-based OBJ index, or of a negative one
+    # counting back from the last of the count records read so far. works on
+    # ints and on numpy arrays of indices and counts alike.
+    def relative_index(index, count):
+        return index - 1 + (index < 0) * (count + 1)
+
+    # the (vertex indices, normal indices) of each triangle in a face record
+    # that follows vertex_count vertices and normal_count normals. indices are
+    # zero-based; faces without normals use -1.
+    def fan_triangulation_indices(vertex_indices: Iterable[str], vertex_count: int = 0, normal_count: int = 0) -> List[PythonTuple[PythonTuple[int, int, int], PythonTuple[int, int, int]]]:
+        vertices = []
+        normals = []
+        for token in vertex_indices[1:]:
+            info = token.split('/')
+            vertices.append(ObjFile.relative_index(int(info[0]), vertex_count))
+            normals.append(ObjFile.relative_index(int(info[2]), normal_count) if len(info) > 2 and info[2] != '' else -1)
+
+        if -1 in normals:
+            normals = [-1] * len(normals)
+
+        return [((vertices[0], vertices[index], vertices[index + 1]), (normals[0], normals[index], normals[index + 1])) for index in range(1, len(vertices) - 1)]
+
+    # turns the faces collected in mesh mode into one TriangleMesh per group,
+    # all sharing the file's vertex and normal arrays
+    def build_meshes(self) -> None:
+        vertices = np.array([[p.x, p.y, p.z] for p in self.vertices[1:]], dtype = float).reshape(-1, 3)
+        normals = np.array([[n.x, n.y, n.z] for n in self.normals[1:]], dtype = float).reshape(-1, 3)
+
+        for group_name, faces in self.mesh_faces.items():
+            group = self.named_groups[group_name] if group_name else self.default_group
+            face_vertices = np.array([face for face, _ in faces], dtype = np.int64)
+            face_normals = np.array([face_normal for _, face_normal in faces], dtype = np.int64)
+            group.add_child(TriangleMesh(vertices, face_vertices, normals, face_normals))
+
+    # the same result as parse_obj_file, but reads the file in chunk_size blocks
+    # and converts vertex, normal and face records to arrays in bulk instead of
+    # one Point and one triangle at a time. vertex_array and normal_array hold
+    # the V x 3 and N x 3 coordinates; vertices and normals are only filled in
+    # when mesh is False, since the triangles need Points.
+    def parse_obj_file_chunked(filepath: str, mesh: bool = False, chunk_size: int = 1 << 22) -> 'ObjFile':
+        objFile = ObjFile()
+        groups = [objFile.default_group]
+        group_names = [None]
+        vertex_lines = []
+        normal_lines = []
+        face_lines = []
+        # (face line, vertices read, normals read) of faces that may count back
+        relative_faces = []
+        # group i holds the faces from group_starts[i] up to the next start
+        group_starts = [0]
+
+        with open(filepath, "rb") as obj_file:
+            remainder = b''
+            while True:
+                chunk = obj_file.read(chunk_size)
+                if chunk:
+                    lines = (remainder + chunk).split(b'\n')
+                    # the last line may continue in the next chunk
+                    remainder = lines.pop()
+                else:
+                    lines = [remainder] if remainder else []
+                for line in lines:
+                    # records are only split once they have all been read
+                    if line.startswith(b'v '):
+                        vertex_lines.append(line)
+                        continue
+                    if line.startswith(b'f '):
+                        if b'-' in line:
+                            relative_faces.append((len(face_lines), len(vertex_lines), len(normal_lines)))
+                        face_lines.append(line)
+                        continue
+                    if line.startswith(b'vn '):
+                        normal_lines.append(line)
+                        continue
+
+                    tokens = line.split()
+                    if len(tokens) == 4 and tokens[0] == b'v':
+                        vertex_lines.append(line)
+                    elif len(tokens) >= 4 and tokens[0] == b'f':
+                        if b'-' in line:
+                            relative_faces.append((len(face_lines), len(vertex_lines), len(normal_lines)))
+                        face_lines.append(line)
+                    elif len(tokens) == 2 and tokens[0] == b'g':
+                        groups.append(Group())
+                        group_names.append(tokens[1].decode())
+                        group_starts.append(len(face_lines))
+                        objFile.named_groups[group_names[-1]] = groups[-1]
+                    elif len(tokens) == 4 and tokens[0] == b'vn':
+                        normal_lines.append(line)
+                    else:
+                        objFile.ignored_lines += 1
+                if not chunk:
+                    break
+
+        objFile.vertex_array = ObjFile.coordinate_array(objFile, vertex_lines, b'v')
+        objFile.normal_array = ObjFile.coordinate_array(objFile, normal_lines, b'vn')
+        if not mesh:
+            objFile.vertices = [None] + [Point(x, y, z) for x, y, z in objFile.vertex_array.tolist()]
+            objFile.normals = [None] + [Vector(x, y, z) for x, y, z in objFile.normal_array.tolist()]
+
+        face_groups = np.repeat(np.arange(len(groups)), np.diff(group_starts + [len(face_lines)]))
+        vertex_counts = normal_counts = None
+        if relative_faces:
+            vertex_counts = np.zeros(len(face_lines), dtype = np.int64)
+            normal_counts = np.zeros(len(face_lines), dtype = np.int64)
+            lines, vertices_read, normals_read = (list(column) for column in zip(*relative_faces))
+            vertex_counts[lines] = ObjFile.records_read(vertex_lines, len(objFile.vertex_array))[vertices_read]
+            normal_counts[lines] = ObjFile.records_read(normal_lines, len(objFile.normal_array))[normals_read]
+        counts, vertex_indices, normal_indices = ObjFile.face_indices(face_lines, vertex_counts, normal_counts)
+        # faces of fewer than three vertices are ignored, as in parse_obj_file
+        polygons = counts >= 3
+        if not polygons.all():
+            objFile.ignored_lines += int(np.count_nonzero(~polygons))
+            polygon_tokens = np.repeat(polygons, counts)
+            vertex_indices = vertex_indices[polygon_tokens]
+            normal_indices = normal_indices[polygon_tokens]
+            counts = counts[polygons]
+            face_groups = face_groups[polygons]
+        if len(counts) == 0:
+            return objFile
+
+        faces, face_normals, face_of_triangle = ObjFile.fan_triangulation_arrays(vertex_indices, normal_indices, counts)
+        triangle_groups = face_groups[face_of_triangle]
+
+        if mesh:
+            # faces of a group that is declared again all go to its last Group, as in parse_obj_file
+            last_declared = {name: index for index, name in enumerate(group_names)}
+            triangle_groups = np.array([last_declared[name] for name in group_names], dtype = np.int64)[triangle_groups]
+            for index in np.unique(triangle_groups).tolist():
+                in_group = triangle_groups == index
+                groups[index].add_child(TriangleMesh(objFile.vertex_array, faces[in_group], objFile.normal_array, face_normals[in_group]))
+            return objFile
+
+        from triangle import Triangle
+
+        points = objFile.vertices[1:]
+        vectors = objFile.normals[1:]
+        for index, (p1, p2, p3), (n1, n2, n3) in zip(triangle_groups.tolist(), faces.tolist(), face_normals.tolist()):
+            if n1 < 0:
+                groups[index].add_child(Triangle(points[p1], points[p2], points[p3]))
+            else:
+                groups[index].add_child(SmoothTriangle(points[p1], points[p2], points[p3], vectors[n1], vectors[n2], vectors[n3]))
+
         return objFile
 
+    # the N x 3 coordinates of lines that start with keyword, counting any
+    # without exactly three coordinates as ignored
+    def coordinate_array(self, lines: List[bytes], keyword: bytes) -> np.ndarray:
+        fields = b' '.join(lines).split()
+        if len(fields) != 4 * len(lines) or fields[::4].count(keyword) != len(lines):
+            records = [tokens for tokens in map(bytes.split, lines) if len(tokens) == 4]
+            self.ignored_lines += len(lines) - len(records)
+            fields = [field for tokens in records for field in tokens]
+
+        del fields[::4]
+        return np.array(fields, dtype = float).reshape(-1, 3)
+
+    # the number of records among the first i of lines, for every i, leaving
+    # out those coordinate_array ignored. negative indices count back from it.
+    def records_read(lines: List[bytes], records: int) -> np.ndarray:
+        if records == len(lines):
+            return np.arange(len(lines) + 1)
+        return np.concatenate(([0], np.cumsum([len(line.split()) == 4 for line in lines])))
+
+    # the vertex count of each face line along with the zero-based vertex and
+    # normal indices of all their tokens, which take the forms v, v/vt, v/vt/vn
+    # and v//vn. normal indices are -1 where there are none. negative indices
+    # count back from the vertex_counts and normal_counts of their lines.
+    def face_indices(lines: List[bytes], vertex_counts: np.ndarray = None, normal_counts: np.ndarray = None) -> PythonTuple[np.ndarray, np.ndarray, np.ndarray]:
+        text = b'\n'.join(lines)
+        characters = np.frombuffer(text, dtype = np.uint8)
+        solid = np.concatenate(([False], characters > ord(' ')))
+        token_starts = np.flatnonzero(solid[1:] & ~solid[:-1])
+        line_of_token = np.searchsorted(np.flatnonzero(characters == ord('\n')), token_starts, side = 'right')
+        # less one for the f keyword
+        counts = np.bincount(line_of_token, minlength = len(lines)) - 1
+        tokens = int(counts.sum())
+        token_vertex_counts = 0 if vertex_counts is None else np.repeat(vertex_counts, counts)
+        token_normal_counts = 0 if normal_counts is None else np.repeat(normal_counts, counts)
+
+        # when every token has the same form the whole text converts at once
+        slashes = text.count(b'/')
+        if slashes == 0:
+            fields = text.replace(b'f', b' ').split()
+            if len(fields) == tokens:
+                vertex_indices = ObjFile.relative_index(np.array(fields, dtype = np.int64), token_vertex_counts)
+                return counts, vertex_indices, np.full(tokens, -1, dtype = np.int64)
+        elif slashes == 2 * tokens:
+            fields = text.replace(b'f', b' ').replace(b'//', b'/0/').replace(b'/', b' ').split()
+            if len(fields) == 3 * tokens:
+                fields = np.array(fields, dtype = np.int64).reshape(-1, 3)
+                return counts, ObjFile.relative_index(fields[:, 0], token_vertex_counts), ObjFile.relative_index(fields[:, 2], token_normal_counts)
+
+        # mixed forms, resolved token by token
+        infos = [token.split(b'/') for line in lines for token in line.split()[1:]]
+        vertex_indices = ObjFile.relative_index(np.array([int(info[0]) for info in infos], dtype = np.int64), token_vertex_counts)
+        # a missing normal reads as index 0, which resolves to -1
+        normal_indices = ObjFile.relative_index(np.array([int(info[2]) if len(info) > 2 and info[2] != b'' else 0 for info in infos], dtype = np.int64), token_normal_counts)
+        return counts, vertex_indices, normal_indices
+
+    # fan triangulates faces given as consecutive runs of counts[i] vertex and
+    # normal indices, returning the T x 3 vertex and normal indices of the
+    # triangles in file order and the face each came from. as in
+    # fan_triangulation_indices, a face missing any normal gets none.
+    def fan_triangulation_arrays(vertex_indices: np.ndarray, normal_indices: np.ndarray, counts: np.ndarray) -> PythonTuple[np.ndarray, np.ndarray, np.ndarray]:
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        triangle_counts = counts - 2
+        face_of_triangle = np.repeat(np.arange(len(counts)), triangle_counts)
+        fan = np.arange(len(face_of_triangle)) - np.repeat(np.cumsum(triangle_counts) - triangle_counts, triangle_counts) + 1
+        first = starts[face_of_triangle]
+        corners = np.stack((first, first + fan, first + fan + 1), axis = 1)
+
+        has_normals = np.minimum.reduceat(normal_indices, starts) >= 0
+        face_normals = np.where(has_normals[face_of_triangle][:, np.newaxis], normal_indices[corners], -1)
+        return vertex_indices[corners], face_normals, face_of_triangle
+
     def fan_triangulation(vertices: Iterable[Point], vertex_normals: Iterable[Point], vertex_indices: Iterable[str]) -> Iterable:
         from triangle import Triangle
 
@@ -1,4 +1,4 @@
-from matrix import Matrix
+from matrix import Matrix, Transformable
 from shape import Shape
 from color import Color
 from tuple import Point
@@ -7,7 +7,7 @@ from abc import ABC, abstractmethod
 import math
 import numpy as np
 
-class Pattern(ABC):
+class Pattern(Transformable, ABC):
     def __init__(self, color_a: Color, color_b: Color):
         self.a: Color = color_a
         self.b: Color = color_b
@@ -18,7 +18,10 @@ class Pattern(ABC):
 
     def pattern_at_shape(self, shape: Shape, world_point: Point) -> Color:
         object_point = shape.world_to_object(world_point)
-        pattern_point = Matrix.multiply_tuple(Matrix.inverse(self.transform), object_point)
+        if self.identity_transform:
+            return self.pattern_at(object_point)
+
+        pattern_point = Matrix.multiply_tuple(self.inverse_rows, object_point)
         return self.pattern_at(pattern_point)
 
     @abstractmethod
@@ -1,11 +1,12 @@
 import math
+import numpy as np
 
 from bounds import Bounds
 from intersection import Intersection
 from ray import Ray
 from shape import Shape
 from tuple import *
-from typing import Iterable
+from typing import Iterable, Tuple as PythonTuple
 
 class Plane(Shape):
     def __init__(self):
@@ -21,6 +22,13 @@ class Plane(Shape):
         t = -ray.origin.y / ray.direction.y
         return [Intersection(t, self)]
 
+    def local_intersect_batch(self, origins: np.ndarray, directions: np.ndarray) -> PythonTuple[np.ndarray, None, None]:
+        hit = np.abs(directions[:, 1]) >= Constants.epsilon
+
+        t = np.full((len(origins), 1), math.inf)
+        t[hit, 0] = -origins[hit, 1] / directions[hit, 1]
+        return t, None, None
+
     def local_normal_at(self, local_point: Point = None, intersection: Intersection = None) -> Vector:
         return Vector(0, 1, 0)
 
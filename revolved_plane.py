@@ -7,6 +7,7 @@ from tuple import *
 from typing import Iterable
 
 import math
+import numpy as np
 
 class RevolvedPlane(Shape):
     def __init__(self):
@@ -89,6 +90,52 @@ class RevolvedPlane(Shape):
 
         return xs
 
+    # batch versions of the helpers above, for N x 4 arrays of ray origins and
+    # directions. each returns an N x 2 array of t values, inf where there is no hit.
+    def check_cap_batch(origins: np.ndarray, directions: np.ndarray, t: np.ndarray, radius: float) -> np.ndarray:
+        x = origins[:, 0] + t * directions[:, 0]
+        z = origins[:, 2] + t * directions[:, 2]
+
+        return (x ** 2 + z ** 2) <= abs(radius)
+
+    def intersect_caps_batch(self, origins: np.ndarray, directions: np.ndarray, lower_radius: float, upper_radius: float) -> np.ndarray:
+        ts = np.full((len(origins), 2), math.inf)
+        if self.closed is False:
+            return ts
+
+        dy = directions[:, 1]
+        capped = np.abs(dy) >= Constants.epsilon
+        dy = np.where(capped, dy, 1)
+
+        t0 = (self.minimum - origins[:, 1]) / dy
+        t1 = (self.maximum - origins[:, 1]) / dy
+
+        hit0 = capped & RevolvedPlane.check_cap_batch(origins, directions, t0, lower_radius)
+        hit1 = capped & RevolvedPlane.check_cap_batch(origins, directions, t1, upper_radius)
+        ts[hit0, 0] = t0[hit0]
+        ts[hit1, 1] = t1[hit1]
+        return ts
+
+    def find_intersections_batch(self, origins: np.ndarray, directions: np.ndarray, a: np.ndarray, b: np.ndarray, c: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        disc = b ** 2 - 4 * a * c
+        valid = valid & (disc >= 0)
+
+        root = np.sqrt(np.where(valid, disc, 0))
+        a = np.where(valid, a, 1)
+        t0 = (-b - root) / (2 * a)
+        t1 = (-b + root) / (2 * a)
+
+        # for truncated shapes
+        y0 = origins[:, 1] + t0 * directions[:, 1]
+        y1 = origins[:, 1] + t1 * directions[:, 1]
+        hit0 = valid & (self.minimum < y0) & (y0 < self.maximum)
+        hit1 = valid & (self.minimum < y1) & (y1 < self.maximum)
+
+        ts = np.full((len(origins), 2), math.inf)
+        ts[hit0, 0] = t0[hit0]
+        ts[hit1, 1] = t1[hit1]
+        return ts
+
     @abstractmethod
     def bounds_of(self) -> Bounds:
         pass
@@ -1,19 +1,29 @@
+import math
 import numpy as np
 
 from abc import ABC, abstractmethod
 from bounds import Bounds
 from intersection import Intersection
 from material import Material
-from matrix import Matrix
+from matrix import Matrix, Transformable
 from ray import Ray
 from tuple import *
-from typing import Iterable, List
+from typing import Iterable, List, Tuple as PythonTuple
 
-class Shape(ABC):
+class Shape(Transformable, ABC):
     def __init__(self):
         self.material: Material = Material()
-        self.transform: np.ndarray = np.identity(4)
         self.parent: 'Shape' = None
+        # the ObjectLists of the worlds this shape is a top-level object of
+        self.owners: List['ObjectList'] = []
+        self.transform: np.ndarray = np.identity(4)
+
+    # owners are not part of a shape: each ObjectList registers itself again
+    # with the shapes it is rebuilt from
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["owners"] = []
+        return state
 
     @abstractmethod
     def __eq__(self, other):
@@ -23,13 +33,62 @@ class Shape(ABC):
         return TestShape()
 
     def intersect(self, ray: Ray) -> List[Intersection]:
-        local_ray = Ray.transform(ray, Matrix.inverse(self.transform))
+        if self.identity_transform:
+            local_ray = ray
+        else:
+            local_ray = Ray.transform(ray, self.inverse_rows)
         return self.local_intersect(local_ray)
 
     @abstractmethod
     def local_intersect(self, ray: Ray) -> Iterable[Intersection]:
         pass
 
+    # closest-hit query: the nearest intersection with 0 <= t < t_max, or None
+    def intersect_closest(self, ray: Ray, t_max: float = math.inf) -> Intersection:
+        if self.identity_transform:
+            local_ray = ray
+        else:
+            local_ray = Ray.transform(ray, self.inverse_rows)
+        return self.local_intersect_closest(local_ray, t_max)
+
+    def local_intersect_closest(self, ray: Ray, t_max: float) -> Intersection:
+        closest = None
+        for intersection in self.local_intersect(ray):
+            if 0 <= intersection.t < t_max:
+                closest = intersection
+                t_max = intersection.t
+        return closest
+
+    # any-hit query: is there an intersection with 0 <= t < distance?
+    def occluded(self, ray: Ray, distance: float) -> bool:
+        if self.identity_transform:
+            local_ray = ray
+        else:
+            local_ray = Ray.transform(ray, self.inverse_rows)
+        return self.local_occluded(local_ray, distance)
+
+    def local_occluded(self, ray: Ray, distance: float) -> bool:
+        for intersection in self.local_intersect(ray):
+            if 0 <= intersection.t < distance:
+                return True
+        return False
+
+    # origins and directions are N x 4 arrays holding one point/vector per row
+    def intersect_batch(self, origins: np.ndarray, directions: np.ndarray) -> PythonTuple[np.ndarray, np.ndarray, np.ndarray]:
+        if not self.identity_transform:
+            origins = Matrix.multiply_points(self.inverse_transform, origins)
+            directions = Matrix.multiply_points(self.inverse_transform, directions)
+        return self.local_intersect_batch(origins, directions)
+
+    # batch kernels return (t, u, v), where t is an N x k array of intersection
+    # distances (inf where a ray has fewer than k hits) and u, v hold the matching
+    # surface coordinates, or are None for shapes that do not use them
+    def local_intersect_batch(self, origins: np.ndarray, directions: np.ndarray) -> PythonTuple[np.ndarray, np.ndarray, np.ndarray]:
+        raise NotImplementedError(f"{type(self).__name__} has no batch intersection kernel")
+
+    def has_batch_kernel(self) -> bool:
+        return type(self).local_intersect_batch is not Shape.local_intersect_batch
+
     def normal_at(self, point: Point, intersection: Intersection = None) -> Tuple:
         local_point = self.world_to_object(point)
         local_normal = self.local_normal_at(local_point, intersection)
@@ -42,12 +101,20 @@ class Shape(ABC):
     def world_to_object(self, point: Point) -> Point:
         if self.parent is not None:
             point = self.parent.world_to_object(point)
-        
-        return Matrix.multiply_tuple(Matrix.inverse(self.transform), point)
+
+        if self.identity_transform:
+            return point
+
+        return Matrix.multiply_tuple(self.inverse_rows, point)
 
     def normal_to_world(self, normal: Vector) -> Vector:
-        normal = Matrix.multiply_tuple(Matrix.inverse(self.transform).transpose(), normal)
-        normal.w = 0
+        if self.similarity:
+            # the inverse transpose of a rotation scaled evenly is the same rotation
+            # over the scale, so the transform itself turns normals the right way
+            normal = Matrix.multiply_tuple(self.transform_rows, normal)
+        elif not self.identity_transform:
+            normal = Matrix.multiply_tuple(self.inverse_transpose_rows, normal)
+            normal.w = 0
         normal = Vector.normalize(normal)
 
         if self.parent is not None:
@@ -61,11 +128,36 @@ class Shape(ABC):
         pass
 
     def parent_space_bounds_of(self)-> Bounds:
+        if self.identity_transform:
+            return self.bounds_of()
         return self.bounds_of().transform(self.transform)
 
+    # drop any cached bounds that depend on this shape, up the parent chain
+    def invalidate_bounds(self) -> None:
+        self.bounds_changed()
+
+    def transform_changed(self) -> None:
+        # the shape's box in its parent's space moved
+        self.bounds_changed()
+
+    # tells whatever holds the shape that its box may have changed: its parent,
+    # the worlds it is a top-level object of and the instances placing it
+    def bounds_changed(self) -> None:
+        if self.parent is not None:
+            self.parent.invalidate_bounds()
+        for owner in self.owners:
+            owner.changed()
+
     def divide(self, threshold: int) -> None:
         pass
 
+    def divide_sah(self, leaf_size: int = 4, bins: int = 12) -> None:
+        pass
+
+    # the expected cost of intersecting a ray with this shape, see Group.expected_cost
+    def expected_cost(self) -> float:
+        return Constants.bvh_intersection_cost
+
 class TestShape(Shape):
     def __init__(self):
         super().__init__()
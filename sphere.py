@@ -4,9 +4,10 @@ from intersection import Intersection
 from ray import Ray
 from shape import Shape
 from tuple import *
-from typing import Iterable
+from typing import Iterable, Tuple as PythonTuple
 
 import math
+import numpy as np
 
 class Sphere(Shape):
     def __init__(self):
@@ -32,6 +33,22 @@ class Sphere(Shape):
 
         return Intersection.intersections(Intersection(t1, self), Intersection(t2, self))
 
+    def local_intersect_batch(self, origins: np.ndarray, directions: np.ndarray) -> PythonTuple[np.ndarray, None, None]:
+        sphere_to_ray = origins[:, :3]
+        direction = directions[:, :3]
+        a = np.einsum('ij,ij->i', direction, direction)
+        b = 2 * np.einsum('ij,ij->i', direction, sphere_to_ray)
+        c = np.einsum('ij,ij->i', sphere_to_ray, sphere_to_ray) - 1
+        discriminant = b**2 - 4 * a * c
+
+        hit = discriminant >= 0
+        root = np.sqrt(np.where(hit, discriminant, 0))
+
+        t = np.full((len(origins), 2), math.inf)
+        t[hit, 0] = ((-b - root) / (2 * a))[hit]
+        t[hit, 1] = ((-b + root) / (2 * a))[hit]
+        return t, None, None
+
     def local_normal_at(self, local_point: Point, intersection: Intersection = None) -> Vector:
         return Vector(local_point.x, local_point.y, local_point.z)
 
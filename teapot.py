@@ -1,12 +1,14 @@
 from camera import Camera
 from color import Color
 from light import PointLight
+from obj_cache import ObjCache
 from obj_file import ObjFile
 from tuple import *
 from world import World
 
 if __name__ == '__main__':
-    parser = ObjFile.parse_obj_file("teapot-low.obj")
+    # the parsed meshes and their BVHs are cached beside the file after the first run
+    parser = ObjCache.load("teapot-low.obj", threshold = 1)
     teapot = ObjFile.obj_to_group(parser)
     teapot.material.ambient = .3
     teapot.material.color = Color(.75, .1, .1)
@@ -165,6 +165,39 @@ class TestBoundingBoxes(unittest.TestCase):
         self.assertEqual(right.min, Point(-1, -2, 2))
         self.assertEqual(right.max, Point(5, 3, 7))
 
+    # Scenario: The overlap of two bounding boxes
+    def test_overlap_of_boxes(self):
+        box = Bounds(Point(-1, -2, -3), Point(5, 3, 7))
+        overlap = box.overlap(Bounds(Point(2, -4, 0), Point(8, 1, 9)))
+        self.assertEqual(overlap.min, Point(2, -2, 0))
+        self.assertEqual(overlap.max, Point(5, 1, 7))
+        self.assertTrue(box.overlap(Bounds(Point(6, 0, 0), Point(8, 1, 1))).is_empty())
+        self.assertFalse(box.is_empty())
+
+    # Scenario: An empty bounding box adds nothing to another
+    def test_adding_empty_box(self):
+        box = Bounds(Point(-1, -2, -3), Point(5, 3, 7))
+        box.add_box(Bounds())
+        box.add_box(Bounds().transform(Transformations.translation(1, 2, 3)))
+        self.assertEqual(box.min, Point(-1, -2, -3))
+        self.assertEqual(box.max, Point(5, 3, 7))
+
+    # Scenario: An empty bounding box is missed by every ray
+    def test_empty_box_missed(self):
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        self.assertFalse(Bounds().intersects(r))
+        self.assertFalse(Bounds(Point(1, 0, 0), Point(-1, 1, 1)).intersects(r))
+
+    # Scenario: Transforming an infinite bounding box
+    def test_transforming_infinite_box(self):
+        plane = Bounds(Point(-math.inf, 0, -math.inf), Point(math.inf, 0, math.inf))
+        box = plane.transform(Transformations.translation(0, -1, 0))
+        self.assertEqual((box.min.y, box.max.y), (-1, -1))
+        self.assertEqual((box.min.x, box.max.x), (-math.inf, math.inf))
+        box = plane.transform(Transformations.rotation_y(math.pi / 4))
+        self.assertFalse(box.is_empty())
+        self.assertEqual((box.min.z, box.max.z), (-math.inf, math.inf))
+
 if __name__ == '__main__':
     unittest.main()
     
\ No newline at end of file
@@ -0,0 +1,92 @@
+import numpy as np
+import os, sys
+import unittest
+
+sys.path.append(os.path.abspath('..'))
+from bvh import BVH
+from group import Group
+from intersection import Intersection
+from ray import Ray
+from shape import Shape
+from sphere import Sphere
+from transformations import Transformations
+from tuple import *
+
+class TestBVH(unittest.TestCase):
+    # Background:
+    def setUp(self):
+        self.spheres = []
+        self.group = Group()
+        for x in range(4):
+            s = Sphere()
+            s.transform = Transformations.translation(x * 3, 0, 0)
+            self.spheres.append(s)
+            self.group.add_child(s)
+        self.group.divide(1)
+
+    # Scenario: Flattening a divided group into arrays
+    def test_flatten_group_arrays(self):
+        bvh = BVH.from_group(self.group)
+        nodes = len(bvh.node_bounds)
+        self.assertEqual(bvh.node_bounds.shape, (nodes, 6))
+        self.assertEqual(list(bvh.node_bounds[0]), [-1, -1, -1, 10, 1, 1])
+        self.assertEqual(len(bvh.child_offsets), nodes + 1)
+        self.assertEqual(len(bvh.prim_offsets), nodes + 1)
+        self.assertEqual(bvh.child_offsets[-1], nodes - 1)
+        self.assertEqual(sorted(map(id, bvh.primitives)), sorted(map(id, self.spheres)))
+        for prim, s in enumerate(bvh.primitives):
+            box = s.parent_space_bounds_of()
+            self.assertEqual(list(bvh.prim_bounds[prim]), [box.min.x, box.min.y, box.min.z, box.max.x, box.max.y, box.max.z])
+
+    # Scenario: A transformed subgroup is kept as a primitive
+    def test_transformed_subgroup_is_primitive(self):
+        g = Group()
+        sub = Group()
+        sub.transform = Transformations.translation(5, 0, 0)
+        sub.add_child(Sphere())
+        g.add_child(sub)
+        bvh = BVH.from_group(g)
+        self.assertEqual(len(bvh.node_bounds), 1)
+        self.assertEqual(bvh.primitives, [sub])
+
+    # Scenario: A flattened group finds the same intersections as the group hierarchy
+    def test_flattened_group_intersections(self):
+        r = Ray(Point(-5, 0, 0), Vector(1, 0, 0))
+        expected = self.group.intersect(r)
+        self.group.flatten()
+        self.assertIsNotNone(self.group.bvh)
+        xs = self.group.intersect(r)
+        self.assertEqual([i.t for i in xs], [i.t for i in expected])
+        self.assertEqual([i.object for i in xs], [i.object for i in expected])
+
+    # Scenario: The closest hit of a flattened group
+    def test_flattened_group_intersect_closest(self):
+        self.group.flatten()
+        r = Ray(Point(15, 0, 0), Vector(-1, 0, 0))
+        hit = self.group.intersect_closest(r)
+        self.assertIs(hit.object, self.spheres[3])
+        self.assertEqual(hit.t, 5)
+        hit = self.group.intersect_closest(Ray(Point(3, 0, 0), Vector(-1, 0, 0)))
+        self.assertIs(hit.object, self.spheres[1])
+        self.assertEqual(hit.t, 1)
+        self.assertIsNone(self.group.intersect_closest(Ray(Point(15, 5, 0), Vector(-1, 0, 0))))
+
+    # Scenario: An occlusion query on a flattened group
+    def test_flattened_group_occluded(self):
+        self.group.flatten()
+        r = Ray(Point(15, 0, 0), Vector(-1, 0, 0))
+        self.assertTrue(self.group.occluded(r, 6))
+        self.assertFalse(self.group.occluded(r, 4))
+
+    # Scenario: Changing the subtree drops the flattened BVH
+    def test_subtree_change_drops_bvh(self):
+        self.group.flatten()
+        s = Sphere()
+        s.transform = Transformations.translation(0, 5, 0)
+        self.group.members[0].add_child(s)
+        self.assertIsNone(self.group.bvh)
+        hit = self.group.intersect_closest(Ray(Point(0, 10, 0), Vector(0, -1, 0)))
+        self.assertIs(hit.object, s)
+
+if __name__ == '__main__':
+    unittest.main()
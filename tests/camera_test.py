@@ -1,5 +1,6 @@
 import math
 import os, sys
+import tempfile
 import unittest
 
 import numpy as np
@@ -8,6 +9,7 @@ sys.path.append(os.path.abspath('..'))
 from camera import Camera
 from canvas import Canvas
 from color import Color
+from group import Group
 from transformations import Transformations
 from tuple import *
 from world import World
@@ -56,6 +58,19 @@ class TestCamera(unittest.TestCase):
         self.assertEqual(r.origin, Point(0, 2, -5))
         self.assertEqual(r.direction, Vector(math.sqrt(2) / 2, 0, -math.sqrt(2) / 2))
 
+    # Scenario: The camera's inverse transform and origin are cached until the transform is reassigned
+    def test_camera_origin_cached(self):
+        c = Camera(201, 101, math.pi / 2)
+        self.assertEqual(c.origin, Point(0, 0, 0))
+        c.transform = Transformations.rotation_y(math.pi / 4).dot(Transformations.translation(0, -2, 5))
+        origin = c.origin
+        self.assertEqual(origin, Point(0, 2, -5))
+        self.assertIs(c.origin, origin)
+        self.assertIs(Camera.ray_for_pixel(c, 0, 0).origin, origin)
+        c.transform = Transformations.translation(1, 0, 0)
+        self.assertEqual(c.origin, Point(-1, 0, 0))
+        self.assertEqual(Camera.ray_for_pixel(c, 100, 50).origin, Point(-1, 0, 0))
+
     # Scenario: Rendering a world with a camera
     def test_render_world_camera(self):
         w = World.default_world()
@@ -67,6 +82,91 @@ class TestCamera(unittest.TestCase):
         image = Camera.render(c, w)
         self.assertEqual(Canvas.pixel_at(image, 5, 5), Color(0.38066, 0.47583, 0.2855))
 
+    # Scenario: Constructing the rays of a tile matches ray_for_pixel
+    def test_rays_for_tile(self):
+        c = Camera(201, 101, math.pi / 2)
+        c.transform = Transformations.rotation_y(math.pi / 4).dot(Transformations.translation(0, -2, 5))
+        origins, directions = Camera.rays_for_tile(c, 10, 20, 14, 23)
+        self.assertEqual(origins.shape, (12, 4))
+        self.assertEqual(directions.shape, (12, 4))
+        for index in range(12):
+            r = Camera.ray_for_pixel(c, 10 + index % 4, 20 + index // 4)
+            self.assertEqual(Tuple(*origins[index]), r.origin)
+            self.assertEqual(Tuple(*directions[index]), r.direction)
+
+    # Scenario: Rendering with the vectorized renderer matches the scalar renderer
+    def test_render_vectorized_matches_render(self):
+        w = World.default_world()
+        w.objects[1].material.reflective = 0.5
+        c = Camera(11, 9, math.pi / 2)
+        c.transform = World.view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+        expected = Camera.render(c, w)
+        image = Camera.render_vectorized(c, w, tile_size = 4)
+        for y in range(9):
+            for x in range(11):
+                self.assertEqual(Canvas.pixel_at(image, x, y), Canvas.pixel_at(expected, x, y))
+
+    # Scenario: The vectorized renderer falls back to the scalar path for shapes without a batch kernel
+    def test_render_vectorized_scalar_fallback(self):
+        w = World.default_world()
+        g = Group()
+        g.add_child(w.objects[1])
+        w.objects[1] = g
+        c = Camera(11, 11, math.pi / 2)
+        c.transform = World.view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+        self.assertFalse(g.has_batch_kernel())
+        image = Camera.render_vectorized(c, w)
+        self.assertEqual(Canvas.pixel_at(image, 5, 5), Color(0.38066, 0.47583, 0.2855))
+
+    # Scenario: Rendering with a process pool matches the serial renderer exactly
+    def test_render_workers_matches_serial(self):
+        w = World.default_world()
+        c = Camera(11, 7, math.pi / 2)
+        c.transform = World.view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+        expected = Camera.render(c, w)
+        image = Camera.render(c, w, workers = 3, tile_size = 4)
+        for y in range(7):
+            for x in range(11):
+                pixel = Canvas.pixel_at(image, x, y)
+                expected_pixel = Canvas.pixel_at(expected, x, y)
+                self.assertEqual((pixel.red, pixel.green, pixel.blue), (expected_pixel.red, expected_pixel.green, expected_pixel.blue))
+
+    # Scenario: Rendering in row blocks yields the rows of the full render in order
+    def test_render_rows_matches_render(self):
+        w = World.default_world()
+        c = Camera(11, 9, math.pi / 2)
+        c.transform = World.view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+        expected = Camera.render(c, w)
+        for workers, vectorized in [(1, False), (1, True), (2, False)]:
+            blocks = list(Camera.render_rows(c, w, rows = 4, workers = workers, vectorized = vectorized))
+            self.assertEqual([y0 for y0, _ in blocks], [0, 4, 8])
+            self.assertEqual([colors.shape for _, colors in blocks], [(4, 11, 3), (4, 11, 3), (1, 11, 3)])
+            self.assertTrue(np.allclose(np.concatenate([colors for _, colors in blocks]), expected.pixels))
+
+    # Scenario: Streaming a render to a PPM file writes the same image as the canvas
+    def test_render_to_ppm(self):
+        w = World.default_world()
+        c = Camera(11, 9, math.pi / 2)
+        c.transform = World.view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+        with tempfile.TemporaryDirectory() as directory:
+            Camera.render_to_ppm(c, w, os.path.join(directory, "streamed.ppm"), rows = 2)
+            Canvas.write_ppm(Camera.render(c, w), os.path.join(directory, "canvas.ppm"))
+            with open(os.path.join(directory, "streamed.ppm"), "rb") as streamed, open(os.path.join(directory, "canvas.ppm"), "rb") as expected:
+                self.assertEqual(streamed.read(), expected.read())
+
+    # Scenario: Render workers write straight into a canvas mapped over a PPM file
+    def test_render_workers_into_mapped_ppm(self):
+        w = World.default_world()
+        c = Camera(11, 7, math.pi / 2)
+        c.transform = World.view_transform(Point(0, 0, -5), Point(0, 0, 0), Vector(0, 1, 0))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mapped.ppm")
+            image = Camera.render(c, w, workers = 2, tile_size = 4, canvas = Canvas.memmap_ppm(11, 7, path))
+            Canvas.write_ppm(Camera.render(c, w), os.path.join(directory, "serial.ppm"))
+            with open(path, "rb") as mapped, open(os.path.join(directory, "serial.ppm"), "rb") as serial:
+                self.assertEqual(mapped.read(), serial.read())
+            del image
+
 if __name__ == '__main__':
     unittest.main()
     
\ No newline at end of file
@@ -1,4 +1,7 @@
+import numpy as np
 import os, sys
+import pickle
+import tempfile
 import unittest
 sys.path.append(os.path.abspath('..'))
 from canvas import *
@@ -11,7 +14,7 @@ class TestColor(unittest.TestCase):
         black = Color(0, 0, 0)
         for x in range(10):
             for y in range(20):
-                self.assertEqual(c.pixels[y][x], black)
+                self.assertEqual(c.pixel_at(x, y), black)
 
     def test_pixel_write(self):
         c = Canvas(10, 20)
@@ -24,6 +27,51 @@ class TestColor(unittest.TestCase):
                 if x != 2 and y != 3:
                     self.assertEqual(c.pixel_at(x, y), black)
 
+    def test_pixels_are_an_array(self):
+        c = Canvas(10, 20)
+        c.write_pixel(2, 3, Color(1, 0.5, 0.25))
+        self.assertEqual(c.pixels.shape, (20, 10, 3))
+        self.assertEqual(c.pixels[3, 2].tolist(), [1, 0.5, 0.25])
+
+    def test_write_pixel_outside_canvas(self):
+        c = Canvas(10, 20)
+        c.write_pixel(-1, 3, Color(1, 0, 0))
+        c.write_pixel(2, 20, Color(1, 0, 0))
+        self.assertFalse(c.pixels.any())
+
+    def test_write_tile(self):
+        c = Canvas(10, 20)
+        tile = np.arange(2 * 3 * 3, dtype = float).reshape(2, 3, 3)
+        c.write_tile(4, 5, tile)
+        self.assertEqual(c.pixel_at(4, 5), Color(0, 1, 2))
+        self.assertEqual(c.pixel_at(6, 6), Color(15, 16, 17))
+        self.assertEqual(c.pixels.sum(), tile.sum())
+
+    def test_write_tile_clipped(self):
+        c = Canvas(10, 20)
+        tile = np.ones((4, 4, 3))
+        c.write_tile(8, -2, tile)
+        self.assertEqual(c.pixels[:, :, 0].sum(), 4)
+        self.assertEqual(c.pixel_at(9, 1), Color(1, 1, 1))
+        c.write_tile(10, 0, tile)
+        self.assertEqual(c.pixels[:, :, 0].sum(), 4)
+
+    def test_write_scanline(self):
+        c = Canvas(10, 20)
+        c.write_scanline(7, [[0.5, 0.5, 0.5]] * 8, 2)
+        self.assertEqual(c.pixel_at(1, 7), Color(0, 0, 0))
+        self.assertEqual(c.pixel_at(2, 7), Color(0.5, 0.5, 0.5))
+        self.assertEqual(c.pixel_at(9, 7), Color(0.5, 0.5, 0.5))
+        self.assertEqual(c.pixels[:, :, 0].sum(), 4)
+
+    def test_write_array(self):
+        c = Canvas(10, 20)
+        colors = np.random.rand(20, 10, 3)
+        c.write_array(colors)
+        self.assertTrue(np.array_equal(c.pixels, colors))
+        with self.assertRaises(ValueError):
+            c.write_array(np.zeros((10, 20, 3)))
+
     def test_canvas_to_ppm_header(self):
         c = Canvas(5, 3)
         c.canvas_to_ppm()
@@ -73,5 +121,82 @@ class TestColor(unittest.TestCase):
                 ppm_file.readline()
             self.assertEqual(ppm_file.readline(), "\n")
 
+    def test_quantize_matches_scale_ppm_pixel(self):
+        c = Canvas(8, 1)
+        values = [-0.5, 0, 0.5 / 255, 1.5 / 255, 0.5, 0.8, 1, 1.5]
+        c.write_scanline(0, [[value] * 3 for value in values])
+        self.assertEqual(c.quantize()[0, :, 0].tolist(), [Color(0, 0, 0).scale_ppm_pixel(value) for value in values])
+
+    def test_write_ppm_p6(self):
+        c = Canvas(2, 2)
+        c.write_pixel(0, 0, Color(1.5, 0, 0))
+        c.write_pixel(1, 1, Color(0, 0.5, 1))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "image.ppm")
+            c.write_ppm(path)
+            with open(path, "rb") as ppm_file:
+                self.assertEqual(ppm_file.read(), b"P6\n2 2\n255\n" + bytes([255, 0, 0, 0, 0, 0, 0, 0, 0, 0, 128, 255]))
+
+    def test_write_ppm_p3_matches_canvas_to_ppm(self):
+        c = Canvas(10, 2)
+        for x in range(10):
+            for y in range(2):
+                c.write_pixel(x, y, Color(1, 0.8, 0.6))
+        c.canvas_to_ppm()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "image.ppm")
+            c.write_ppm(path, "P3")
+            with open(path, "r") as ppm_file, open("canvas.ppm", "r") as expected_file:
+                self.assertEqual(ppm_file.read(), expected_file.read())
+
+    def test_ppm_stream(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "image.ppm")
+            with PPMStream(path, 2, 3) as stream:
+                stream.write_rows([[[1, 0, 0], [0, 0.5, 1]]])
+                stream.write_rows(np.ones((2, 2, 3)) * 2)
+                self.assertEqual(stream.rows_written, 3)
+                with self.assertRaises(ValueError):
+                    stream.write_rows(np.zeros((1, 2, 3)))
+            with open(path, "rb") as ppm_file:
+                self.assertEqual(ppm_file.read(), b"P6\n2 3\n255\n" + bytes([255, 0, 0, 0, 128, 255] + [255] * 12))
+
+    def test_memmap_canvas(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "pixels.npy")
+            c = Canvas.memmap(10, 20, path)
+            c.write_pixel(2, 3, Color(1, 0.5, 0.25))
+            c.write_tile(4, 5, np.ones((2, 2, 3)))
+            self.assertEqual(c.pixel_at(2, 3), Color(1, 0.5, 0.25))
+            c.flush()
+            self.assertTrue(np.array_equal(np.load(path), c.pixels))
+            del c
+
+    def test_memmap_ppm_canvas(self):
+        expected = Canvas(3, 2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "image.ppm")
+            c = Canvas.memmap_ppm(3, 2, path)
+            for canvas in [c, expected]:
+                canvas.write_pixel(0, 0, Color(1.5, 0, 0))
+                canvas.write_scanline(1, [[0, 0.5, 1], [0.2, 0.4, 0.6]], 1)
+            self.assertEqual(c.pixel_at(1, 1), Color(0, 128 / 255, 1))
+            c.flush()
+            expected.write_ppm(os.path.join(directory, "expected.ppm"))
+            with open(path, "rb") as ppm_file, open(os.path.join(directory, "expected.ppm"), "rb") as expected_file:
+                self.assertEqual(ppm_file.read(), expected_file.read())
+            del c
+
+    def test_memmap_canvas_pickles_as_its_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            c = Canvas.memmap_ppm(100, 100, os.path.join(directory, "image.ppm"))
+            data = pickle.dumps(c)
+            self.assertLess(len(data), 1000)
+            copy = pickle.loads(data)
+            copy.write_pixel(5, 6, Color(1, 1, 1))
+            copy.flush()
+            self.assertEqual(c.pixel_at(5, 6), Color(1, 1, 1))
+            del c, copy
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
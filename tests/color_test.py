@@ -29,5 +29,13 @@ class TestColor(unittest.TestCase):
         c2 = Color(0.9, 1, 0.1)
         self.assertEqual(c1 * c2, Color(0.9, 0.2, 0.04))
 
+    def test_color_has_slots(self):
+        c = Color(0.9, 0.6, 0.75)
+        self.assertFalse(hasattr(c, '__dict__'))
+        self.assertEqual((c.red, c.green, c.blue), (0.9, 0.6, 0.75))
+        self.assertIsInstance(c + c, Color)
+        self.assertIsInstance(c - c, Color)
+        self.assertIsInstance(c * 0.5, Color)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,6 +1,8 @@
 import os, sys
 import unittest
 
+import numpy as np
+
 sys.path.append(os.path.abspath('..'))
 from collections import namedtuple
 from cone import Cone
@@ -81,5 +83,19 @@ class TestCones(unittest.TestCase):
         self.assertEqual(box.min, Point(-5, -5, -5))
         self.assertEqual(box.max, Point(5, 3, 5))
 
+    # Scenario: Intersecting a batch of rays with a closed cone matches local_intersect
+    def test_intersect_batch_cone(self):
+        shape = Cone()
+        shape.minimum = -0.5
+        shape.maximum = 0.5
+        shape.closed = True
+        rays = [Ray(Point(0, 0, -5), Vector(0, 0, 1)), Ray(Point(1, 1, -5), Vector(-0.5, -1, 1)), Ray(Point(0, 0, -1), Vector(0, 1, 1)), Ray(Point(0, 0, -0.25), Vector(0, 1, 0)), Ray(Point(0, 0, -0.25), Vector(0, 1, 1))]
+        origins = np.array([[r.origin.x, r.origin.y, r.origin.z, 1] for r in rays])
+        directions = np.array([[r.direction.x, r.direction.y, r.direction.z, 0] for r in rays])
+        t, u, v = shape.local_intersect_batch(origins, directions)
+        for index, r in enumerate(rays):
+            expected = sorted(i.t for i in shape.local_intersect(r))
+            self.assertTrue(np.allclose(sorted(t[index][np.isfinite(t[index])]), expected))
+
 if __name__ == '__main__':
     unittest.main()
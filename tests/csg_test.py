@@ -2,6 +2,7 @@ import os, sys
 import unittest
 
 sys.path.append(os.path.abspath('..'))
+from bvh import BVH
 from collections import namedtuple
 from csg import CSG
 from cube import Cube
@@ -102,11 +103,31 @@ class TestCSG(unittest.TestCase):
         left = Sphere()
         right = Sphere()
         right.transform = Transformations.translation(2, 3, 4)
-        shape = CSG("difference", left, right)
+        shape = CSG("union", left, right)
         box = shape.bounds_of()
         self.assertEqual(box.min, Point(-1, -1, -1))
         self.assertEqual(box.max, Point(3, 4, 5))
 
+    # Scenario: The bounding box of a CSG shape depends on its operation
+    def test_csg_bounding_box_per_operation(self):
+        left = Sphere()
+        right = Sphere()
+        right.transform = Transformations.translation(1, 0.5, 0)
+        box = CSG("difference", left, right).bounds_of()
+        self.assertEqual((box.min, box.max), (Point(-1, -1, -1), Point(1, 1, 1)))
+        box = CSG("intersection", left, right).bounds_of()
+        self.assertEqual((box.min, box.max), (Point(0, -0.5, -1), Point(1, 1, 1)))
+        far = Sphere()
+        far.transform = Transformations.translation(5, 0, 0)
+        shape = CSG("intersection", left, far)
+        self.assertTrue(shape.bounds_of().is_empty())
+        self.assertEqual(shape.intersect(Ray(Point(-5, 0, 0), Vector(1, 0, 0))), [])
+        # an empty box adds nothing to its group's box
+        g = Group()
+        g.add_child(shape)
+        g.add_child(Sphere())
+        self.assertEqual((g.bounds_of().min, g.bounds_of().max), (Point(-1, -1, -1), Point(1, 1, 1)))
+
     # Scenario: Intersecting ray+csg doesn't test children if box is missed
     def test_intersect_ray_csg_test_no_children(self):
         left = TestShape()
@@ -117,16 +138,61 @@ class TestCSG(unittest.TestCase):
         self.assertIsNone(left.saved_ray)
         self.assertIsNone(right.saved_ray)
 
+    # Scenario: A ray never descends into an intersection of disjoint children
+    def test_disjoint_intersection_csg_never_descended(self):
+        left = TestShape()
+        left.transform = Transformations.translation(-3, 0, 0)
+        right = TestShape()
+        right.transform = Transformations.translation(3, 0, 0)
+        shape = CSG("intersection", left, right)
+        self.assertTrue(shape.bounds_of().is_empty())
+        r = Ray(Point(-10, 0, 0), Vector(1, 0, 0))
+        self.assertFalse(shape.bounds_of().intersects(r))
+        self.assertEqual(shape.intersect(r), [])
+        self.assertIsNone(shape.intersect_closest(r))
+        self.assertFalse(shape.occluded(r, 100))
+        self.assertIsNone(left.saved_ray)
+        self.assertIsNone(right.saved_ray)
+        # nor through a group or its flattened hierarchy
+        g = Group()
+        g.add_child(shape)
+        self.assertEqual(g.intersect(r), [])
+        self.assertIsNone(g.intersect_closest(r))
+        g.flatten()
+        tmin, tmax = BVH.box_distances(g.bvh.prim_box_list[0], r)
+        self.assertGreater(tmin, tmax)
+        self.assertEqual(g.intersect(r), [])
+        self.assertIsNone(left.saved_ray)
+        self.assertIsNone(right.saved_ray)
+
     # Scenario: Intersecting ray+csg tests children if box is hit
     def test_intersect_ray_csg_test_children(self):
         left = TestShape()
         right = TestShape()
-        shape = CSG("difference", left, right)
+        shape = CSG("union", left, right)
         r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
         xs = shape.intersect(r)
         self.assertIsNotNone(left.saved_ray)
         self.assertIsNotNone(right.saved_ray)
 
+    # Scenario: Intersections and differences skip the right child when the left is missed
+    def test_intersect_ray_csg_skips_right_child(self):
+        for operation in ["intersection", "difference"]:
+            left = TestShape()
+            right = TestShape()
+            shape = CSG(operation, left, right)
+            shape.intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1)))
+            self.assertIsNotNone(left.saved_ray)
+            self.assertIsNone(right.saved_ray)
+
+        # a difference still keeps the left hits when the right child is missed
+        left = Sphere()
+        right = Sphere()
+        right.transform = Transformations.translation(0, 5, 0)
+        xs = CSG("difference", left, right).intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1)))
+        self.assertEqual([x.t for x in xs], [4, 6])
+        self.assertEqual(CSG("intersection", left, right).intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1))), [])
+
     # Scenario: Subdividing a CSG shape subdivides its children
     def test_subdivide_csg_subdivide_children(self):
         s1 = Sphere()
@@ -154,5 +220,52 @@ class TestCSG(unittest.TestCase):
         self.assertIsInstance(right.members[1], Group)
         self.assertEqual(right.members[1].members, [s4])
 
+    # Scenario: Changing an operand's transform invalidates the CSG bounding box
+    def test_csg_bounds_invalidated_by_child_transform(self):
+        left = Sphere()
+        right = Sphere()
+        shape = CSG("union", left, right)
+        self.assertEqual(shape.bounds_of().max, Point(1, 1, 1))
+        right.transform = Transformations.translation(2, 3, 4)
+        self.assertEqual(shape.bounds_of().max, Point(3, 4, 5))
+
+    # Scenario: An occlusion query on a CSG shape only counts surviving hits
+    def test_csg_occluded_filters_children(self):
+        s1 = Sphere()
+        s2 = Sphere()
+        s2.transform = Transformations.scaling(2, 2, 2)
+        c = CSG("difference", s1, s2)
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        self.assertFalse(c.occluded(r, 10))
+        c = CSG("union", s1, s2)
+        self.assertTrue(c.occluded(r, 10))
+        self.assertFalse(c.occluded(r, 2))
+
+    # Scenario: A CSG indexes the leaves of its left operand by identity
+    def test_csg_left_members(self):
+        s1 = Sphere()
+        s2 = Cube()
+        s3 = Sphere()
+        left = Group()
+        left.add_child(s1)
+        left.add_child(CSG("union", s2, Sphere()))
+        c = CSG("difference", left, s3)
+        self.assertEqual(c.left_members(), CSG.member_ids(left))
+        self.assertIn(id(s1), c.left_members())
+        self.assertIn(id(s2), c.left_members())
+        self.assertNotIn(id(s3), c.left_members())
+        # equal shapes on either side are told apart
+        xs = Intersection.intersections(Intersection(1, s1), Intersection(2, s3), Intersection(3, s1), Intersection(4, s3))
+        self.assertEqual(c.filter_intersections(xs), [xs[0], xs[1]])
+
+    # Scenario: Adding to the left operand of a CSG rebuilds its index
+    def test_csg_left_members_invalidated(self):
+        left = Group()
+        c = CSG("union", left, Sphere())
+        self.assertEqual(c.left_members(), set())
+        s = Sphere()
+        left.add_child(s)
+        self.assertEqual(c.left_members(), {id(s)})
+
 if __name__ == '__main__':
     unittest.main()
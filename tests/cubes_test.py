@@ -1,6 +1,8 @@
 import os, sys
 import unittest
 
+import numpy as np
+
 sys.path.append(os.path.abspath('..'))
 from collections import namedtuple
 from cube import Cube
@@ -70,6 +72,31 @@ class TestCubes(unittest.TestCase):
         self.assertEqual(box.min, Point(-1, -1, -1))
         self.assertEqual(box.max, Point(1, 1, 1))
 
+    # Scenario: Intersecting a batch of rays with a cube matches local_intersect
+    def test_intersect_batch_cube(self):
+        c = Cube()
+        rays = [Ray(Point(5, 0.5, 0), Vector(-1, 0, 0)), Ray(Point(0, 0.5, 0), Vector(0, 0, 1)), Ray(Point(-2, 0, 0), Vector(0.2673, 0.5345, 0.8018)), Ray(Point(2, 2, 0), Vector(-1, 0, 0))]
+        origins = np.array([[r.origin.x, r.origin.y, r.origin.z, 1] for r in rays])
+        directions = np.array([[r.direction.x, r.direction.y, r.direction.z, 0] for r in rays])
+        t, u, v = c.local_intersect_batch(origins, directions)
+        self.assertEqual(list(t[0]), [4, 6])
+        self.assertEqual(list(t[1]), [-1, 1])
+        self.assertEqual(len(c.local_intersect(rays[2])), 0)
+        self.assertTrue(np.all(np.isinf(t[2:])))
+
+    # Scenario: A batch ray parallel to a face it starts on matches local_intersect
+    def test_intersect_batch_cube_origin_on_face(self):
+        c = Cube()
+        rays = [Ray(Point(-1, 0.5, -5), Vector(0, 0, 1)), Ray(Point(0.5, 1, -5), Vector(0, 0, 1)), Ray(Point(1, 1, -5), Vector(0, 0, 1)), Ray(Point(0, 0, -1), Vector(1, 0, 0)), Ray(Point(1.5, 0, -5), Vector(0, 0, 1))]
+        origins = np.array([[r.origin.x, r.origin.y, r.origin.z, 1] for r in rays])
+        directions = np.array([[r.direction.x, r.direction.y, r.direction.z, 0] for r in rays])
+        t, u, v = c.local_intersect_batch(origins, directions)
+        for ray, ts in zip(rays, t.tolist()):
+            xs = c.local_intersect(ray)
+            self.assertEqual([x.t for x in xs] if xs else [math.inf, math.inf], ts)
+        self.assertEqual(list(t[0]), [4, 6])
+        self.assertEqual(list(t[3]), [-1, 1])
+
 if __name__ == '__main__':
     unittest.main()
     
\ No newline at end of file
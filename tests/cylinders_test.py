@@ -2,6 +2,8 @@ import math
 import os, sys
 import unittest
 
+import numpy as np
+
 sys.path.append(os.path.abspath('..'))
 from collections import namedtuple
 from cylinder import Cylinder
@@ -141,5 +143,20 @@ class TestCylinders(unittest.TestCase):
         self.assertEqual(box.min, Point(-1, -5, -1))
         self.assertEqual(box.max, Point(1, 3, 1))
         
+
+    # Scenario: Intersecting a batch of rays with a closed, truncated cylinder matches local_intersect
+    def test_intersect_batch_cylinder(self):
+        cyl = Cylinder()
+        cyl.minimum = 1
+        cyl.maximum = 2
+        cyl.closed = True
+        rays = [Ray(Point(0, 3, 0), Vector(0, -1, 0)), Ray(Point(0, 3, -2), Vector(0, -1, 2)), Ray(Point(0, 1.5, -2), Vector(0, 0, 1)), Ray(Point(0, 1.5, -2), Vector(0, 1, 0))]
+        origins = np.array([[r.origin.x, r.origin.y, r.origin.z, 1] for r in rays])
+        directions = np.array([[r.direction.x, r.direction.y, r.direction.z, 0] for r in rays])
+        t, u, v = cyl.local_intersect_batch(origins, directions)
+        for index, r in enumerate(rays):
+            expected = sorted(i.t for i in cyl.local_intersect(r))
+            self.assertTrue(np.allclose(sorted(t[index][np.isfinite(t[index])]), expected))
+
 if __name__ == '__main__':
     unittest.main()
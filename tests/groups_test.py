@@ -3,7 +3,10 @@ import os, sys
 import unittest
 
 sys.path.append(os.path.abspath('..'))
+from bounds import Bounds
+from csg import CSG
 from cylinder import Cylinder
+from plane import Plane
 from group import Group
 from ray import Ray
 from shape import Shape
@@ -169,6 +172,172 @@ class TestGroups(unittest.TestCase):
         self.assertEqual(subgroup.members[0].members, [s1])
         self.assertEqual(subgroup.members[1].members, [s2, s3])
 
+    # Scenario: A group's bounding box is cached between queries
+    def test_group_bounds_cached(self):
+        g = Group()
+        g.add_child(Sphere())
+        box = g.bounds_of()
+        self.assertIs(g.bounds_of(), box)
+
+    # Scenario: Adding a child to a nested group invalidates every ancestor's bounds
+    def test_add_child_invalidates_ancestor_bounds(self):
+        inner = Group()
+        inner.add_child(Sphere())
+        outer = Group()
+        outer.add_child(inner)
+        self.assertEqual(outer.bounds_of().max, Point(1, 1, 1))
+        s = Sphere()
+        s.transform = Transformations.translation(5, 0, 0)
+        inner.add_child(s)
+        self.assertEqual(inner.bounds_of().max, Point(6, 1, 1))
+        self.assertEqual(outer.bounds_of().max, Point(6, 1, 1))
+
+    # Scenario: Changing a child's transform invalidates the group's bounds
+    def test_child_transform_invalidates_group_bounds(self):
+        s = Sphere()
+        g = Group()
+        g.add_child(s)
+        self.assertEqual(g.bounds_of().min, Point(-1, -1, -1))
+        s.transform = Transformations.translation(0, -3, 0)
+        self.assertEqual(g.bounds_of().min, Point(-1, -4, -1))
+
+    # Scenario: Subdividing a group keeps its bounds consistent
+    def test_divide_invalidates_group_bounds(self):
+        s1 = Sphere()
+        s1.transform = Transformations.translation(-2, 0, 0)
+        s2 = Sphere()
+        s2.transform = Transformations.translation(2, 0, 0)
+        g = Group()
+        g.add_child(s1)
+        g.add_child(s2)
+        g.bounds_of()
+        g.divide(1)
+        subgroup = g.members[0]
+        self.assertEqual(subgroup.bounds_of().max, Point(-1, 1, 1))
+        self.assertEqual(g.bounds_of().min, Point(-3, -1, -1))
+        self.assertEqual(g.bounds_of().max, Point(3, 1, 1))
+
+    # Scenario: An occlusion query on a group stops at the first blocking child
+    def test_group_occluded_stops_at_first_hit(self):
+        s = Sphere()
+        child = Shape.test_shape()
+        g = Group()
+        g.add_child(s)
+        g.add_child(child)
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        self.assertTrue(g.occluded(r, 10))
+        self.assertIsNone(child.saved_ray)
+        self.assertFalse(g.occluded(r, 3))
+        self.assertIsNotNone(child.saved_ray)
+
+    # Scenario: The closest hit of a group matches the hit of its intersections
+    def test_group_intersect_closest(self):
+        g = Group()
+        s1 = Sphere()
+        s2 = Sphere()
+        s2.transform = Transformations.translation(0, 0, -3)
+        s3 = Sphere()
+        s3.transform = Transformations.translation(5, 0, 0)
+        g.add_child(s1)
+        g.add_child(s2)
+        g.add_child(s3)
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        hit = g.intersect_closest(r)
+        self.assertIs(hit.object, s2)
+        self.assertEqual(hit.t, 1)
+        self.assertIsNone(g.intersect_closest(r, 1))
+
+    # Scenario: The closest-hit query skips children whose box starts beyond the closest hit
+    def test_group_intersect_closest_prunes_far_children(self):
+        g = Group()
+        near = Sphere()
+        far = Shape.test_shape()
+        far.transform = Transformations.translation(0, 0, 10)
+        g.add_child(far)
+        g.add_child(near)
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        hit = g.intersect_closest(r)
+        self.assertIs(hit.object, near)
+        self.assertIsNone(far.saved_ray)
+
+    # Scenario: Subdividing a group with the surface area heuristic separates clusters
+    def test_divide_sah_separates_clusters(self):
+        g = Group()
+        left = []
+        right = []
+        for n in range(3):
+            s1 = Sphere()
+            s1.transform = Transformations.translation(-10, n * 2, 0)
+            s2 = Sphere()
+            s2.transform = Transformations.translation(10, n * 2, 0)
+            left.append(s1)
+            right.append(s2)
+            g.add_child(s1)
+            g.add_child(s2)
+        g.divide_sah(leaf_size = 3)
+        self.assertEqual(len(g.members), 2)
+        self.assertEqual(g.members[0].members, left)
+        self.assertEqual(g.members[1].members, right)
+
+    # Scenario: The surface area heuristic keeps unbounded children in the parent group
+    def test_divide_sah_keeps_unbounded_children(self):
+        g = Group()
+        p = Plane()
+        g.add_child(p)
+        for n in range(4):
+            s = Sphere()
+            s.transform = Transformations.translation(n * 3, 0, 0)
+            g.add_child(s)
+        g.divide_sah(leaf_size = 1)
+        self.assertEqual(g.members[0], p)
+        self.assertEqual(len(g.members), 3)
+        r = Ray(Point(6, 0, -5), Vector(0, 0, 1))
+        self.assertEqual(g.intersect_closest(r).t, 4)
+
+    # Scenario: The surface area heuristic moves children with empty boxes out of the parent group
+    def test_divide_sah_moves_empty_children(self):
+        g = Group()
+        p = Plane()
+        g.add_child(p)
+        far = Sphere()
+        far.transform = Transformations.translation(50, 0, 0)
+        empty = CSG("intersection", Sphere(), far)
+        g.add_child(empty)
+        for n in range(4):
+            s = Sphere()
+            s.transform = Transformations.translation(n * 3, 0, 0)
+            g.add_child(s)
+        g.divide_sah(leaf_size = 1)
+        self.assertEqual(g.members[0], p)
+        self.assertEqual(len(g.members), 3)
+        self.assertIsNot(empty.parent, g)
+        self.assertTrue(all(member is not empty for member in g.members))
+        self.assertEqual((g.members[1].bounds_of().min, g.members[1].bounds_of().max), (Point(-1, -1, -1), Point(4, 1, 1)))
+
+    # Scenario: The surface area heuristic finds no split for boxes without area
+    def test_sah_split_without_area(self):
+        members = [(Sphere(), Bounds(Point(n, 0, 0), Point(n, 0, 0))) for n in range(4)]
+        self.assertIsNone(Group.sah_split(members, 4))
+
+    # Scenario: Subdividing a group lowers its expected traversal cost
+    def test_divide_lowers_expected_cost(self):
+        def spheres() -> Group:
+            g = Group()
+            for x in range(4):
+                for y in range(4):
+                    s = Sphere()
+                    s.transform = Transformations.translation(x * 4, y * 4, 0)
+                    g.add_child(s)
+            return g
+        flat = spheres()
+        midpoint = spheres()
+        midpoint.divide(2)
+        sah = spheres()
+        sah.divide_sah(leaf_size = 2)
+        self.assertAlmostEqual(flat.expected_cost(), 16 * Constants.bvh_traversal_cost + 16 * Constants.bvh_intersection_cost * 24 / (2 * (14 * 14 + 14 * 2 + 2 * 14)))
+        self.assertLess(midpoint.expected_cost(), flat.expected_cost())
+        self.assertLess(sah.expected_cost(), flat.expected_cost())
+
 if __name__ == '__main__':
     unittest.main()
     
\ No newline at end of file
@@ -0,0 +1,222 @@
+import math
+import os, sys
+import pickle
+import unittest
+
+sys.path.append(os.path.abspath('..'))
+from color import Color
+from computations import Computations
+from csg import CSG
+from cube import Cube
+from group import Group
+from instance import Instance, InstancedShape
+from intersection import Intersection
+from light import PointLight
+from material import Material
+from pattern import Stripe
+from ray import Ray
+from sphere import Sphere
+from transformations import Transformations
+from triangle_mesh import TriangleMesh
+from tuple import *
+from world import World
+
+class TestInstance(unittest.TestCase):
+    def sphere_group(self) -> Group:
+        g = Group()
+        s = Sphere()
+        s.transform = Transformations.translation(5, 0, 0)
+        g.add_child(s)
+        return g
+
+    # Scenario: Intersecting an instance intersects its prototype in the instance's space
+    def test_intersecting_instance(self):
+        prototype = self.sphere_group()
+        instance = Instance(prototype)
+        instance.transform = Transformations.scaling(2, 2, 2)
+        r = Ray(Point(10, 0, -10), Vector(0, 0, 1))
+        xs = instance.intersect(r)
+        self.assertEqual([x.t for x in xs], [8, 12])
+        self.assertIsInstance(xs[0].object, InstancedShape)
+        self.assertIs(xs[0].object.shape, prototype.members[0])
+        self.assertIs(xs[0].object, xs[1].object)
+        self.assertIsNone(prototype.parent)
+        self.assertEqual(instance.intersect_closest(r).t, 8)
+        self.assertTrue(instance.occluded(r, 9))
+        self.assertFalse(instance.occluded(r, 8))
+
+    # Scenario: Finding the normal on a shape of an instance
+    def test_normal_on_instanced_shape(self):
+        inner = Group()
+        inner.transform = Transformations.scaling(1, 2, 3)
+        s = Sphere()
+        s.transform = Transformations.translation(5, 0, 0)
+        inner.add_child(s)
+        instance = Instance(inner)
+        instance.transform = Transformations.rotation_y(math.pi / 2)
+
+        # the same shapes nested in an ordinary group
+        outer = Group()
+        outer.transform = Transformations.rotation_y(math.pi / 2)
+        copy = Group()
+        copy.transform = Transformations.scaling(1, 2, 3)
+        copied = Sphere()
+        copied.transform = Transformations.translation(5, 0, 0)
+        copy.add_child(copied)
+        outer.add_child(copy)
+
+        point = Point(1.7321, 1.1547, -5.5774)
+        hit = Intersection(0, InstancedShape(instance, s))
+        self.assertEqual(hit.object.normal_at(point, hit), copied.normal_at(point))
+        self.assertEqual(hit.object.world_to_object(point), copied.world_to_object(point))
+
+    # Scenario: Editing a prototype after instancing reaches the instances placing it
+    def test_editing_prototype_after_instancing(self):
+        prototype = self.sphere_group()
+        outer = Group()
+        outer.add_child(Instance(prototype))
+        w = World()
+        w.objects = [Instance(prototype) for _ in range(World.bvh_threshold)]
+        for index, instance in enumerate(w.objects):
+            instance.transform = Transformations.translation(0, 3 * index, 0)
+        r = Ray(Point(-5, 0, -10), Vector(0, 0, 1))
+        self.assertEqual(outer.intersect(r), [])
+        self.assertIsNone(World.hit_world(w, r))
+        self.assertIsNotNone(World.acceleration(w)[0])
+
+        s = Sphere()
+        s.transform = Transformations.translation(-5, 0, 0)
+        prototype.add_child(s)
+        self.assertEqual([x.t for x in outer.intersect(r)], [9, 11])
+        self.assertEqual(World.hit_world(w, r).t, 9)
+
+        # an unpickled instance listens to its unpickled prototype
+        instance = pickle.loads(pickle.dumps(outer.members[0]))
+        self.assertTrue(any(owner is instance for owner in instance.prototype.owners))
+
+    # Scenario: Instances share one prototype and render like copies of it
+    def test_instances_render_like_copies(self):
+        prototype = self.sphere_group()
+        prototype.members[0].material.color = Color(0.2, 0.6, 0.9)
+        shared = World()
+        copies = World()
+        for world in [shared, copies]:
+            world.light = PointLight(Point(-10, 10, -10), Color(1, 1, 1))
+        for angle in [0, math.pi / 2, math.pi]:
+            instance = Instance(prototype)
+            instance.transform = Transformations.rotation_y(angle)
+            shared.objects.append(instance)
+            copy = self.sphere_group()
+            copy.members[0].material.color = Color(0.2, 0.6, 0.9)
+            copy.transform = Transformations.rotation_y(angle)
+            copies.objects.append(copy)
+
+        for origin in [Point(5, 0.3, -10), Point(-10, 0.2, 4.8), Point(-5.2, -0.1, 10)]:
+            r = Ray(origin, Vector.normalize(Point(0, 0, 0) - origin))
+            self.assertEqual(World.color_at(shared, r), World.color_at(copies, r))
+        self.assertEqual(len(prototype.members), 1)
+        self.assertIs(prototype.members[0].parent, prototype)
+
+    # Scenario: An instance's material overrides the materials of its prototype
+    def test_instance_material_override(self):
+        prototype = self.sphere_group()
+        plain = Instance(prototype)
+        material = Material()
+        material.color = Color(1, 0, 0)
+        material.pattern = Stripe(Color(1, 1, 1), Color(0, 0, 0))
+        painted = Instance(prototype, material)
+        painted.transform = Transformations.translation(0, 5, 0)
+        r = Ray(Point(5, 0, -10), Vector(0, 0, 1))
+        self.assertIs(plain.intersect_closest(r).object.material, prototype.members[0].material)
+        self.assertIsNone(plain.override_material)
+        self.assertEqual(plain.material, Material())
+        self.assertIs(painted.override_material, material)
+        self.assertEqual(painted.material, Material())
+        self.assertNotEqual(Instance(prototype, material), Instance(prototype))
+        hit = painted.intersect_closest(Ray(Point(5, 5, -10), Vector(0, 0, 1)))
+        self.assertIs(hit.object.material, material)
+        # patterns are looked up in the space of the shape that was hit
+        self.assertEqual(hit.object.world_to_object(Point(5.5, 5, 0)), Point(0.5, 0, 0))
+
+    # Scenario: Instances reuse the BVH of a shared triangle mesh
+    def test_instance_of_divided_mesh(self):
+        vertices = [[i, 0, 0] for i in range(21)] + [[i + 0.5, 1, 0] for i in range(20)]
+        faces = [[i, i + 1, 21 + i] for i in range(20)]
+        mesh = TriangleMesh(vertices, faces)
+        mesh.divide(2)
+        bvh = mesh.bvh
+        instances = [Instance(mesh) for _ in range(3)]
+        for index, instance in enumerate(instances):
+            instance.transform = Transformations.translation(0, 0, index)
+        for index, instance in enumerate(instances):
+            hit = instance.intersect_closest(Ray(Point(7.5, 0.25, -5), Vector(0, 0, 1)))
+            self.assertEqual(hit.t, 5 + index)
+            self.assertEqual(hit.face, 7)
+            self.assertEqual(hit.object.normal_at(Point(7.5, 0.25, index), hit), Vector(0, 0, -1))
+        self.assertIs(mesh.bvh, bvh)
+
+    # Scenario: An instance may reference a bare BVH
+    def test_instance_of_bvh(self):
+        prototype = self.sphere_group()
+        prototype.flatten()
+        instance = Instance(prototype.bvh)
+        instance.transform = Transformations.translation(0, 1, 0)
+        self.assertEqual(instance.bounds_of().min, Point(4, -1, -1))
+        self.assertEqual(instance.parent_space_bounds_of().max, Point(6, 2, 1))
+        xs = instance.intersect(Ray(Point(5, 1, -5), Vector(0, 0, 1)))
+        self.assertEqual([x.t for x in xs], [4, 6])
+        self.assertIs(xs[0].object.shape, prototype.members[0])
+
+    # Scenario: An instance of a transformed group's BVH shades in the BVH's space
+    def test_instance_of_transformed_group_bvh(self):
+        prototype = self.sphere_group()
+        prototype.transform = Transformations.translation(0, 5, 0)
+        parent = Group()
+        parent.transform = Transformations.rotation_z(0.5).dot(Transformations.scaling(1, 2, 3))
+        parent.add_child(prototype)
+        prototype.flatten()
+        instance = Instance(prototype.bvh)
+        hit = instance.intersect_closest(Ray(Point(5, 0, -10), Vector(0, 0, 1)))
+        self.assertEqual(hit.t, 9)
+        self.assertEqual(hit.object.normal_at(Point(5, 0, -1), hit), Vector(0, 0, -1))
+        self.assertEqual(hit.object.world_to_object(Point(5.5, 0, 0)), Point(0.5, 0, 0))
+
+        # and so does one of a transformed mesh's BVH
+        vertices = [[i, 0, 0] for i in range(21)] + [[i + 0.5, 1, 0] for i in range(20)]
+        faces = [[i, i + 1, 21 + i] for i in range(20)]
+        mesh = TriangleMesh(vertices, faces)
+        mesh.transform = Transformations.rotation_x(math.pi / 2)
+        mesh.divide(2)
+        hit = Instance(mesh.bvh).intersect_closest(Ray(Point(7.5, 0.25, -5), Vector(0, 0, 1)))
+        self.assertEqual(hit.t, 5)
+        self.assertEqual(hit.object.normal_at(Point(7.5, 0.25, 0), hit), Vector(0, 0, -1))
+
+    # Scenario: Instances of instances compose their transforms
+    def test_nested_instances(self):
+        prototype = self.sphere_group()
+        inner = Instance(prototype)
+        inner.transform = Transformations.scaling(2, 2, 2)
+        outer = Instance(inner)
+        outer.transform = Transformations.translation(0, 0, 10)
+        r = Ray(Point(10, 0, 0), Vector(0, 0, 1))
+        hit = outer.intersect_closest(r)
+        self.assertEqual(hit.t, 8)
+        self.assertIs(hit.object.shape.shape, prototype.members[0])
+        comps = Computations.prepare_computations(hit, r)
+        self.assertEqual(comps.normalv, Vector(0, 0, -1))
+
+    # Scenario: A CSG tells which instance an instanced shape belongs to
+    def test_csg_of_instances(self):
+        cube = Group()
+        cube.add_child(Cube())
+        left = Instance(cube)
+        right = Instance(cube)
+        right.transform = Transformations.translation(0.5, 0, 0)
+        c = CSG("difference", left, right)
+        xs = c.intersect(Ray(Point(-2, 0, 0), Vector(1, 0, 0)))
+        self.assertEqual([x.t for x in xs], [1, 1.5])
+        self.assertIs(xs[0].object.instance, left)
+        self.assertIs(xs[1].object.instance, right)
+
+if __name__ == '__main__':
+    unittest.main()
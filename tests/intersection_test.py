@@ -148,6 +148,21 @@ class TestIntersections(unittest.TestCase):
             self.assertEqual(comps.n1, refractive_index.n1)
             self.assertEqual(comps.n2, refractive_index.n2)
 
+    # Scenario: Equal but separate shapes are tracked as separate containers
+    def test_n1_n2_with_equal_separate_shapes(self):
+        a = GlassSphere()
+        b = GlassSphere()
+        self.assertEqual(a, b)
+        r = Ray(Point(0, 0, -4), Vector(0, 0, 1))
+        xs = Intersection.intersections(Intersection(3, a), Intersection(3, b), Intersection(5, a), Intersection(5, b))
+        comps = Computations.prepare_computations(xs[1], r, xs)
+        self.assertEqual((comps.n1, comps.n2), (1.5, 1.5))
+        comps = Computations.prepare_computations(xs[2], r, xs)
+        self.assertEqual((comps.n1, comps.n2), (1.5, 1.5))
+        # an equal intersection made separately stands in for the hit
+        comps = Computations.prepare_computations(Intersection(3, a), r, xs)
+        self.assertEqual((comps.n1, comps.n2), (1.0, 1.5))
+
     # Scenario: The under point is offset below the surface
     def test_under_point_offset_below_surface(self):
         r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
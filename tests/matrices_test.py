@@ -60,6 +60,27 @@ class TestMatrices(unittest.TestCase):
         a = Tuple(1, 2, 3, 4)
         self.assertEqual(Matrix.multiply_tuple(np.identity(4), a), a)
 
+    def test_matrix_rows_multiply_tuple(self):
+        a = np.array([[1, 2, 3, 4], [2, 4, 4, 2], [8, 6, 4, 1], [0, 0, 0, 1]], dtype = float)
+        rows = Matrix.rows(a)
+        self.assertEqual(rows[3], [0, 0, 0, 1])
+        self.assertEqual(Matrix.multiply_tuple(rows, Tuple(1, 2, 3, 1)), Tuple(18, 24, 33, 1))
+        self.assertEqual(Matrix.multiply_tuple(rows, Tuple(1, 2, 3, 0)), Tuple(14, 22, 32, 0))
+        self.assertEqual(type(Matrix.multiply_tuple(rows, Tuple(1, 2, 3, 1))).__name__, "Point")
+
+    def test_non_affine_matrix_multiply_tuple(self):
+        a = np.array([[1, 2, 3, 4], [2, 4, 4, 2], [8, 6, 4, 1], [1, 0, 2, 3]])
+        self.assertEqual(Matrix.multiply_tuple(a, Tuple(1, 2, 3, 1)), Tuple(18, 24, 33, 10))
+        self.assertEqual(Matrix.multiply_tuple(Matrix.rows(a), Tuple(1, 2, 3, 1)), Tuple(18, 24, 33, 10))
+
+    def test_matrix_multiply_points(self):
+        points = np.array([[1, 2, 3, 1], [1, 2, 3, 0], [-4, 0.5, 2, 1]])
+        for a in [np.array([[1, 2, 3, 4], [2, 4, 4, 2], [8, 6, 4, 1], [0, 0, 0, 1]]), np.array([[1, 2, 3, 4], [2, 4, 4, 2], [8, 6, 4, 1], [1, 0, 2, 3]])]:
+            result = Matrix.multiply_points(a, points)
+            self.assertEqual(result.shape, (3, 4))
+            for point, transformed in zip(points, result):
+                self.assertEqual(Tuple(*transformed), Matrix.multiply_tuple(a, Tuple(*point)))
+
     def test_transpose_matrix(self):
         a = np.array([[0, 9, 3, 0], [9, 8, 0, 8], [1, 8, 5, 3], [0, 0, 5, 8]])
         a_transposed = np.array([[0, 9, 1, 0], [9, 8, 8, 0], [3, 0, 5, 5], [0, 8, 3, 8]])
@@ -0,0 +1,86 @@
+import numpy as np
+import os, sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath('..'))
+from obj_cache import ObjCache
+from ray import Ray
+from triangle_mesh import TriangleMesh
+from tuple import *
+
+class TestObjCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.directory, "cache")
+        self.path = os.path.join(self.directory, "faces.obj")
+        with open(self.path, "w") as obj_file:
+            obj_file.write("v 0 1 0\nv -1 0 0\nv 1 0 0\nv 0 -1 0\nvn 0 0 -1\n# a comment\ng front\nf 1//1 2//1 3//1\ng back\nf 2 4 3\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Scenario: A cached load maps the meshes written by the first load
+    def test_cached_load_maps_arrays(self):
+        parsed = ObjCache.load(self.path, self.cache_dir)
+        cached = ObjCache.load(self.path, self.cache_dir)
+        self.assertEqual(cached.ignored_lines, parsed.ignored_lines)
+        self.assertIsInstance(cached.vertex_array, np.memmap)
+        self.assertEqual(cached.vertex_array.tolist(), parsed.vertex_array.tolist())
+        for name in ["front", "back"]:
+            mesh = cached.named_groups[name].members[0]
+            self.assertIsInstance(mesh, TriangleMesh)
+            self.assertEqual(mesh.faces.tolist(), parsed.named_groups[name].members[0].faces.tolist())
+        self.assertEqual(cached.named_groups["front"].members[0].face_normals.tolist(), [[0, 0, 0]])
+        self.assertEqual(cached.named_groups["back"].members[0].face_normals.tolist(), [[-1, -1, -1]])
+
+    # Scenario: A cached mesh intersects like the mesh it was written from
+    def test_cached_mesh_intersects(self):
+        ObjCache.load(self.path, self.cache_dir)
+        mesh = ObjCache.load(self.path, self.cache_dir).named_groups["front"].members[0]
+        r = Ray(Point(0, 0.5, -2), Vector(0, 0, 1))
+        xs = mesh.intersect(r)
+        self.assertEqual(len(xs), 1)
+        self.assertEqual(xs[0].t, 2)
+        self.assertEqual(mesh.normal_at(r.position(2), xs[0]), Vector(0, 0, -1))
+
+    # Scenario: The BVH of a divided mesh is cached with it
+    def test_cached_bvh(self):
+        with open(self.path, "w") as obj_file:
+            obj_file.write("".join("v %d 0 0\nv %d.5 1 0\nv %d 0 0\n" % (i, i, i + 1) for i in range(40)))
+            obj_file.write("".join("f %d %d %d\n" % (3 * i + 1, 3 * i + 2, 3 * i + 3) for i in range(40)))
+        parsed = ObjCache.load(self.path, self.cache_dir, threshold = 1).default_group.members[0]
+        mesh = ObjCache.load(self.path, self.cache_dir, threshold = 1).default_group.members[0]
+        self.assertIsNotNone(mesh.bvh)
+        self.assertEqual(mesh.faces.tolist(), parsed.faces.tolist())
+        self.assertEqual(mesh.bvh.node_bounds.tolist(), parsed.bvh.node_bounds.tolist())
+        r = Ray(Point(17.5, 0.25, -1), Vector(0, 0, 1))
+        self.assertEqual(mesh.intersect_closest(r).t, 1)
+        # dividing again with the same threshold keeps the cached hierarchy
+        bvh = mesh.bvh
+        mesh.divide(1)
+        self.assertIs(mesh.bvh, bvh)
+
+    # Scenario: Touching the source reuses the entry while editing it does not
+    def test_cache_invalidated_by_content(self):
+        ObjCache.load(self.path, self.cache_dir)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns = (stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(ObjCache.content_hash(self.path), ObjCache.read_manifest(ObjCache.entry_directory(os.path.abspath(self.path), self.cache_dir))['hash'])
+        self.assertIsInstance(ObjCache.load(self.path, self.cache_dir).vertex_array, np.memmap)
+
+        with open(self.path, "a") as obj_file:
+            obj_file.write("f 1 3 4\n")
+        parser = ObjCache.load(self.path, self.cache_dir)
+        self.assertNotIsInstance(parser.vertex_array, np.memmap)
+        self.assertEqual(parser.named_groups["back"].members[0].faces.tolist(), [[1, 3, 2], [0, 2, 3]])
+
+    # Scenario: A different threshold rebuilds the entry
+    def test_cache_keyed_by_threshold(self):
+        ObjCache.load(self.path, self.cache_dir)
+        self.assertNotIsInstance(ObjCache.load(self.path, self.cache_dir, threshold = 1).vertex_array, np.memmap)
+        self.assertIsInstance(ObjCache.load(self.path, self.cache_dir, threshold = 1).vertex_array, np.memmap)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
+import numpy as np
 import os, sys
 import unittest
 
 sys.path.append(os.path.abspath('..'))
 from obj_file import ObjFile
+from triangle_mesh import TriangleMesh
 from tuple import *
 
 class TestObjFile(unittest.TestCase):
@@ -145,5 +147,98 @@ class TestObjFile(unittest.TestCase):
         self.assertEqual(t1.n3, parser.normals[2])
         self.assertEqual(t2, t1)
 
+    # Scenario: Triangles in groups become one mesh per group in mesh mode
+    def test_triangles_in_groups_mesh(self):
+        parser = ObjFile.parse_obj_file("tests/obj_test_files/triangles.obj", mesh = True)
+        m1 = parser.named_groups["FirstGroup"].members[0]
+        m2 = parser.named_groups["SecondGroup"].members[0]
+        self.assertIsInstance(m1, TriangleMesh)
+        self.assertIs(m1.vertices, m2.vertices)
+        self.assertEqual(m1.faces.tolist(), [[0, 1, 2]])
+        self.assertEqual(m2.faces.tolist(), [[0, 2, 3]])
+        self.assertEqual(m1.vertices.tolist(), [[-1, 1, 0], [-1, 0, 0], [1, 0, 0], [1, 1, 0]])
+
+    # Scenario: Triangulating polygons in mesh mode
+    def test_triangulating_polygons_mesh(self):
+        parser = ObjFile.parse_obj_file("tests/obj_test_files/triangulating_polygons.obj", mesh = True)
+        m = parser.default_group.members[0]
+        self.assertEqual(m.faces.tolist(), [[0, 1, 2], [0, 2, 3], [0, 3, 4]])
+        self.assertEqual(m.face_normals.tolist(), [[-1, -1, -1]] * 3)
+
+    # Scenario: Faces with normals in mesh mode
+    def test_faces_normals_mesh(self):
+        parser = ObjFile.parse_obj_file("tests/obj_test_files/faces_normals.obj", mesh = True)
+        m = parser.default_group.members[0]
+        self.assertEqual(m.faces.tolist(), [[0, 1, 2], [0, 1, 2]])
+        self.assertEqual(m.face_normals.tolist(), [[2, 0, 1], [2, 0, 1]])
+
+    # Scenario: Negative face indices count back from the records read so far in mesh mode
+    def test_negative_indices_mesh(self):
+        self.assertEqual(ObjFile.fan_triangulation_indices(["f", "-3", "-2", "-1"], 4, 0), [((1, 2, 3), (-1, -1, -1))])
+        self.assertEqual(ObjFile.fan_triangulation_indices(["f", "1//-1", "-1//2", "2//-2"], 3, 2), [((0, 2, 1), (1, 1, 0))])
+
+    # Scenario: The chunked parser produces the same groups as the line parser
+    def test_chunked_parser_matches_line_parser(self):
+        for name in sorted(os.listdir("tests/obj_test_files")):
+            for chunk_size in [1, 16, 1 << 22]:
+                expected = ObjFile.parse_obj_file("tests/obj_test_files/" + name)
+                parser = ObjFile.parse_obj_file_chunked("tests/obj_test_files/" + name, chunk_size = chunk_size)
+                self.assertEqual(parser.ignored_lines, expected.ignored_lines)
+                self.assertEqual(parser.vertices, expected.vertices)
+                self.assertEqual(parser.normals, expected.normals)
+                self.assertEqual(parser.default_group.members, expected.default_group.members)
+                self.assertEqual(parser.named_groups.keys(), expected.named_groups.keys())
+                for group_name, group in expected.named_groups.items():
+                    self.assertEqual(parser.named_groups[group_name].members, group.members)
+
+    # Scenario: The chunked parser builds the same meshes as the line parser
+    def test_chunked_parser_matches_line_parser_mesh(self):
+        for name in sorted(os.listdir("tests/obj_test_files")):
+            expected = ObjFile.parse_obj_file("tests/obj_test_files/" + name, mesh = True)
+            parser = ObjFile.parse_obj_file_chunked("tests/obj_test_files/" + name, mesh = True, chunk_size = 16)
+            self.assertEqual(parser.ignored_lines, expected.ignored_lines)
+            groups = [(parser.default_group, expected.default_group)] + [(parser.named_groups[group_name], group) for group_name, group in expected.named_groups.items()]
+            for group, expected_group in groups:
+                self.assertEqual(len(group.members), len(expected_group.members))
+                for m, expected_m in zip(group.members, expected_group.members):
+                    self.assertEqual(m.vertices.tolist(), expected_m.vertices.tolist())
+                    self.assertEqual(m.faces.tolist(), expected_m.faces.tolist())
+                    self.assertEqual(m.face_normals.tolist(), expected_m.face_normals.tolist())
+
+    # Scenario: Faces with normals are resolved in bulk by the chunked parser
+    def test_chunked_parser_faces_normals(self):
+        parser = ObjFile.parse_obj_file_chunked("tests/obj_test_files/faces_normals.obj")
+        t1 = parser.default_group.members[0]
+        self.assertEqual(parser.vertex_array.tolist(), [[0, 1, 0], [-1, 0, 0], [1, 0, 0]])
+        self.assertEqual(parser.normal_array.tolist(), [[-1, 0, 0], [1, 0, 0], [0, 1, 0]])
+        self.assertEqual(t1.n1, parser.normals[3])
+        self.assertEqual(t1.n2, parser.normals[1])
+        self.assertEqual(t1.n3, parser.normals[2])
+
+    # Scenario: Negative face indices are resolved in bulk by the chunked parser
+    def test_chunked_parser_negative_indices(self):
+        vertex_counts = np.array([3, 4])
+        normal_counts = np.array([2, 2])
+        counts, vertex_indices, normal_indices = ObjFile.face_indices([b'f -3 -2 -1', b'f 1 -1 2'], vertex_counts, normal_counts)
+        self.assertEqual(vertex_indices.tolist(), [0, 1, 2, 0, 3, 1])
+        self.assertEqual(normal_indices.tolist(), [-1] * 6)
+        counts, vertex_indices, normal_indices = ObjFile.face_indices([b'f -3//-1 -2//1 -1//-2', b'f 1//2 -1//-1 2//1'], vertex_counts, normal_counts)
+        self.assertEqual(vertex_indices.tolist(), [0, 1, 2, 0, 3, 1])
+        self.assertEqual(normal_indices.tolist(), [1, 0, 0, 1, 1, 0])
+
+    # Scenario: Negative face indices skip malformed records in the chunked parser
+    def test_chunked_parser_negative_indices_after_malformed_records(self):
+        path = "tests/obj_test_files/malformed_vertices.obj"
+        expected = ObjFile.parse_obj_file(path)
+        parser = ObjFile.parse_obj_file_chunked(path)
+        self.assertEqual(parser.ignored_lines, 3)
+        self.assertEqual(parser.default_group.members, expected.default_group.members)
+        t1, t2 = parser.default_group.members
+        self.assertEqual((t1.p1, t1.p2, t1.p3), (parser.vertices[1], parser.vertices[2], parser.vertices[3]))
+        self.assertEqual((t2.p1, t2.p2, t2.p3), (parser.vertices[1], parser.vertices[3], parser.vertices[4]))
+        self.assertEqual((t2.n1, t2.n2, t2.n3), (parser.normals[2], parser.normals[1], parser.normals[2]))
+        mesh = ObjFile.parse_obj_file_chunked(path, mesh = True).default_group.members[0]
+        self.assertEqual(mesh.faces.tolist(), ObjFile.parse_obj_file(path, mesh = True).default_group.members[0].faces.tolist())
+
 if __name__ == '__main__':
     unittest.main()
@@ -142,6 +142,15 @@ class TestPattern(unittest.TestCase):
         self.assertEqual(pattern.pattern_at(Point(0, 0, 0.99)), TestPattern.white)
         self.assertEqual(pattern.pattern_at(Point(0, 0, 1.01)), TestPattern.black)
 
+    # Scenario: Reassigning a pattern transformation drops the cached inverse
+    def test_pattern_transformation_reassigned(self):
+        shape = Sphere()
+        pattern = Pattern.test_pattern()
+        pattern.transform = Transformations.scaling(2, 2, 2)
+        self.assertEqual(pattern.pattern_at_shape(shape, Point(2, 3, 4)), Color(1, 1.5, 2))
+        pattern.transform = Transformations.translation(0.5, 1, 1.5)
+        self.assertEqual(pattern.pattern_at_shape(shape, Point(2.5, 3, 3.5)), Color(2, 2, 2))
+
 if __name__ == '__main__':
     unittest.main()
     
\ No newline at end of file
@@ -2,6 +2,8 @@ import math
 import os, sys
 import unittest
 
+import numpy as np
+
 sys.path.append(os.path.abspath('..'))
 from plane import Plane
 from ray import Ray
@@ -57,6 +59,18 @@ class TestPlanes(unittest.TestCase):
         self.assertEqual(box.min, Point(-math.inf, 0, -math.inf))
         self.assertEqual(box.max, Point(math.inf, 0, math.inf))
     
+
+    # Scenario: Intersecting a batch of rays with a plane
+    def test_intersect_batch_plane(self):
+        p = Plane()
+        origins = np.array([[0, 10, 0, 1], [0, 1, 0, 1], [0, -1, 0, 1]], dtype = float)
+        directions = np.array([[0, 0, 1, 0], [0, -1, 0, 0], [0, 1, 0, 0]], dtype = float)
+        t, u, v = p.local_intersect_batch(origins, directions)
+        self.assertEqual(t.shape, (3, 1))
+        self.assertTrue(math.isinf(t[0, 0]))
+        self.assertAlmostEqual(t[1, 0], 1)
+        self.assertAlmostEqual(t[2, 0], 1)
+
 if __name__ == '__main__':
     unittest.main()
     
\ No newline at end of file
@@ -141,5 +141,26 @@ class TestShapes(unittest.TestCase):
         shape.divide(1)
         self.assertIsInstance(shape, Sphere)
 
+    # Scenario: The inverse transformation is cached until the transform is reassigned
+    def test_inverse_transform_cached(self):
+        s = Shape.test_shape()
+        s.transform = Transformations.translation(2, 3, 4)
+        inverse = s.inverse_transform
+        self.assertIs(s.inverse_transform, inverse)
+        self.assertTrue(np.allclose(inverse, Transformations.translation(-2, -3, -4)))
+        self.assertTrue(np.allclose(s.inverse_transpose, inverse.transpose()))
+        s.transform = Transformations.scaling(2, 2, 2)
+        self.assertTrue(np.allclose(s.inverse_transform, Transformations.scaling(0.5, 0.5, 0.5)))
+
+    # Scenario: Intersecting a shape with an identity transform does not transform the ray
+    def test_intersect_identity_shape_reuses_ray(self):
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        s = Shape.test_shape()
+        self.assertTrue(s.identity_transform)
+        s.intersect(r)
+        self.assertIs(s.saved_ray, r)
+        s.transform = Transformations.translation(1, 0, 0)
+        self.assertFalse(s.identity_transform)
+
 if __name__ == '__main__':
     unittest.main()
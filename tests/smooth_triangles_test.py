@@ -1,6 +1,8 @@
 import os, sys
 import unittest
 
+import numpy as np
+
 sys.path.append(os.path.abspath('..'))
 from computations import Computations
 from intersection import Intersection
@@ -49,5 +51,14 @@ class TestSmoothTriangles(unittest.TestCase):
         comps = Computations.prepare_computations(i, r, xs)
         self.assertEqual(comps.normalv, Vector(-0.5547, 0.83205, 0))
 
+    # Scenario: A batch intersection with a smooth triangle stores u/v
+    def test_intersect_batch_smooth_triangle_u_v(self):
+        origins = np.array([[-0.2, 0.3, -2, 1]])
+        directions = np.array([[0, 0, 1, 0]], dtype = float)
+        t, u, v = self.tri.intersect_batch(origins, directions)
+        self.assertAlmostEqual(t[0, 0], 2, delta = Constants.epsilon)
+        self.assertAlmostEqual(u[0, 0], 0.45, delta = Constants.epsilon)
+        self.assertAlmostEqual(v[0, 0], 0.25, delta = Constants.epsilon)
+
 if __name__ == '__main__':
     unittest.main()
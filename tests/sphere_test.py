@@ -139,5 +139,19 @@ class TestSphere(unittest.TestCase):
         self.assertEqual(box.min, Point(-1, -1, -1))
         self.assertEqual(box.max, Point(1, 1, 1))
 
+    # Scenario: Intersecting a batch of rays with a transformed sphere
+    def test_intersect_batch_sphere(self):
+        s = Sphere()
+        s.transform = Transformations.scaling(2, 2, 2)
+        origins = np.array([[0, 0, -5, 1], [0, 2, -5, 1], [0, 3, -5, 1], [0, 0, 0, 1]], dtype = float)
+        directions = np.array([[0, 0, 1, 0]] * 4, dtype = float)
+        t, u, v = s.intersect_batch(origins, directions)
+        self.assertTrue(np.allclose(t[0], [3, 7]))
+        self.assertTrue(np.allclose(t[1], [5, 5]))
+        self.assertTrue(np.all(np.isinf(t[2])))
+        self.assertTrue(np.allclose(t[3], [-2, 2]))
+        self.assertIsNone(u)
+        self.assertIsNone(v)
+
 if __name__ == '__main__':
     unittest.main()
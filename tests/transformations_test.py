@@ -6,6 +6,7 @@ import numpy as np
 
 sys.path.append(os.path.abspath('..'))
 from matrix import Matrix
+from sphere import Sphere
 from tuple import *
 from transformations import Transformations
 from world import World
@@ -161,5 +162,46 @@ class TestMatrices(unittest.TestCase):
         t_expected = np.array([[-0.50709, 0.50709,  0.67612, -2.36643], [0.76772, 0.60609,  0.12122, -2.82843], [-0.35857, 0.59761, -0.71714, 0.00000], [0.00000, 0.00000, 0.00000, 1.00000]])
         self.assertTrue(np.allclose(t, t_expected, atol = Constants.epsilon))
 
+    # Scenario: A transform builder applies its steps in the order they are called
+    def test_builder_chains_in_order(self):
+        builder = Transformations.builder().rotate_x(math.pi / 2).scale(5, 5, 5).translate(10, 5, 7)
+        p = Point(1, 0, 1)
+        self.assertEqual(Matrix.multiply_tuple(builder.matrix, p), Point(15, 0, 7))
+        expected = Transformations.translation(10, 5, 7).dot(Transformations.scaling(5, 5, 5)).dot(Transformations.rotation_x(math.pi / 2))
+        self.assertTrue(np.array_equal(builder.matrix, expected))
+
+    # Scenario: A transform builder inverts its steps in reverse order
+    def test_builder_inverse(self):
+        builder = Transformations.builder().shear(1, 0, 0.5, 0, 0, 2).rotate_y(0.3).scale(2, 3, 4).rotate_z(-1.1).translate(1, -2, 3)
+        self.assertTrue(np.allclose(builder.inverse, Matrix.inverse(builder.matrix), atol = Constants.epsilon))
+        self.assertTrue(np.allclose(builder.matrix.dot(builder.inverse), np.identity(4), atol = Constants.epsilon))
+        self.assertTrue(np.array_equal(Transformations.builder().inverse, np.identity(4)))
+
+    # Scenario: Rotations, translations and uniform scales make a similarity transform
+    def test_builder_similarity(self):
+        self.assertTrue(Transformations.builder().rotate_x(1).scale(2, 2, 2).translate(1, 2, 3).similarity)
+        self.assertFalse(Transformations.builder().rotate_x(1).scale(2, 1, 2).similarity)
+        self.assertFalse(Transformations.builder().shear(1, 0, 0, 0, 0, 0).similarity)
+
+    # Scenario: Applying a builder gives a shape its transform and known inverse
+    def test_builder_apply(self):
+        s = Sphere()
+        builder = Transformations.builder().scale(2, 2, 2).rotate_z(math.pi / 5).translate(0, 1, 0)
+        builder.apply(s)
+        self.assertTrue(np.array_equal(s.transform, builder.matrix))
+        self.assertTrue(np.array_equal(s.inverse_transform, builder.inverse))
+        self.assertTrue(s.similarity)
+        p = Point(0.5, 2, -1)
+        expected = Matrix.multiply_tuple(Matrix.inverse(s.transform).transpose(), s.local_normal_at(s.world_to_object(p)))
+        expected.w = 0
+        self.assertEqual(s.normal_at(p), Vector.normalize(expected))
+        s.transform = builder.matrix
+        self.assertFalse(s.similarity)
+
+    # Scenario: The inverse of a singular shearing cannot be built
+    def test_builder_singular_shear(self):
+        with self.assertRaises(ValueError):
+            Transformations.builder().shear(1, 0, 1, 0, 0, 0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+import math
+import numpy as np
+import os, sys
+import unittest
+
+sys.path.append(os.path.abspath('..'))
+from group import Group
+from intersection import Intersection
+from ray import Ray
+from smooth_triangle import SmoothTriangle
+from transformations import Transformations
+from triangle import Triangle
+from triangle_mesh import TriangleMesh
+from tuple import *
+
+class TestTriangleMesh(unittest.TestCase):
+    # Background:
+    def setUp(self):
+        self.vertices = np.array([[0, 1, 0], [-1, 0, 0], [1, 0, 0], [0, -1, 0]], dtype = float)
+        self.normals = np.array([[0, 1, 0], [-1, 0, 0], [1, 0, 0]], dtype = float)
+        self.faces = np.array([[0, 1, 2], [1, 3, 2]])
+        self.mesh = TriangleMesh(self.vertices, self.faces, self.normals, np.array([[0, 1, 2], [-1, -1, -1]]))
+
+    # Scenario: Constructing a triangle mesh precomputes its edges and face normals
+    def test_constructing_mesh(self):
+        t = Triangle(Point(0, 1, 0), Point(-1, 0, 0), Point(1, 0, 0))
+        self.assertEqual(self.mesh.face_count(), 2)
+        self.assertEqual(Vector(*self.mesh.e1[0]), t.e1)
+        self.assertEqual(Vector(*self.mesh.e2[0]), t.e2)
+        self.assertEqual(Vector(*self.mesh.flat_normals[0]), t.normal)
+
+    # Scenario: Intersecting a ray with a mesh finds the face, t and u/v
+    def test_intersect_mesh(self):
+        r = Ray(Point(-0.2, 0.3, -2), Vector(0, 0, 1))
+        xs = self.mesh.intersect(r)
+        self.assertEqual(len(xs), 1)
+        self.assertAlmostEqual(xs[0].t, 2)
+        self.assertAlmostEqual(xs[0].u, 0.45)
+        self.assertAlmostEqual(xs[0].v, 0.25)
+        self.assertEqual(xs[0].face, 0)
+        xs = self.mesh.intersect(Ray(Point(0, -0.5, -2), Vector(0, 0, 1)))
+        self.assertEqual(xs[0].face, 1)
+        self.assertEqual(len(self.mesh.intersect(Ray(Point(0, 2, -2), Vector(0, 0, 1)))), 0)
+
+    # Scenario: A mesh interpolates vertex normals like a smooth triangle
+    def test_mesh_interpolates_normal(self):
+        tri = SmoothTriangle(Point(0, 1, 0), Point(-1, 0, 0), Point(1, 0, 0), Vector(0, 1, 0), Vector(-1, 0, 0), Vector(1, 0, 0))
+        i = Intersection(1, self.mesh, 0.45, 0.25, 0)
+        expected = tri.normal_at(Point(0, 0, 0), Intersection(1, tri, 0.45, 0.25))
+        self.assertEqual(self.mesh.normal_at(Point(0, 0, 0), i), expected)
+
+    # Scenario: A face without vertex normals is shaded flat
+    def test_mesh_flat_face_normal(self):
+        i = Intersection(1, self.mesh, 0.2, 0.2, 1)
+        self.assertEqual(self.mesh.normal_at(Point(0, -0.5, 0), i), Vector(0, 0, -1))
+
+    # Scenario: A mesh has a bounding box
+    def test_mesh_bounding_box(self):
+        box = self.mesh.bounds_of()
+        self.assertEqual(box.min, Point(-1, -1, 0))
+        self.assertEqual(box.max, Point(1, 1, 0))
+
+    # Scenario: Subdividing a mesh builds a face hierarchy that finds the same hits
+    def test_divide_mesh(self):
+        faces = []
+        vertices = []
+        for n in range(40):
+            vertices.extend([[n * 2, 0, 0], [n * 2 + 1, 0, 0], [n * 2, 1, 0]])
+            faces.append([n * 3, n * 3 + 1, n * 3 + 2])
+        mesh = TriangleMesh(np.array(vertices, dtype = float), np.array(faces))
+        mesh.transform = Transformations.translation(0, 0, 1)
+        g = Group()
+        g.add_child(mesh)
+        rays = [Ray(Point(n + 0.25, 0.25, -5), Vector(0, 0, 1)) for n in range(80)]
+        expected = [g.intersect_closest(r) for r in rays]
+        g.divide(1)
+        self.assertIsNotNone(mesh.bvh)
+        self.assertLessEqual(max(block.end - block.start for block in mesh.bvh.primitives), TriangleMesh.block_size)
+        for r, hit in zip(rays, expected):
+            result = g.intersect_closest(r)
+            if hit is None:
+                self.assertIsNone(result)
+            else:
+                self.assertAlmostEqual(result.t, hit.t)
+                self.assertEqual(mesh.faces[result.face].tolist(), faces[hit.face])
+                self.assertTrue(g.occluded(r, 10))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import os, sys
 import unittest
 
+import numpy as np
+
 sys.path.append(os.path.abspath('..'))
 from ray import Ray
 from triangle import Triangle
@@ -76,6 +78,16 @@ class TestTriangles(unittest.TestCase):
         self.assertEqual(box.min, Point(-3, -1, -4))
         self.assertEqual(box.max, Point(6, 7, 2))
 
+    # Scenario: Intersecting a batch of rays with a triangle
+    def test_intersect_batch_triangle(self):
+        t = Triangle(Point(0, 1, 0), Point(-1, 0, 0), Point(1, 0, 0))
+        origins = np.array([[0, 0.5, -2, 1], [0, -1, -2, 1], [0, -1, -2, 1]], dtype = float)
+        directions = np.array([[0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 1, 0]], dtype = float)
+        ts, us, vs = t.local_intersect_batch(origins, directions)
+        self.assertEqual(ts.shape, (3, 1))
+        self.assertAlmostEqual(ts[0, 0], 2)
+        self.assertTrue(np.all(np.isinf(ts[1:])))
+
 if __name__ == '__main__':
     unittest.main()
     
\ No newline at end of file
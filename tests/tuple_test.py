@@ -114,6 +114,35 @@ class TestTuple(unittest.TestCase):
         r = Vector.reflect(v, n)
         self.assertEqual(r, Vector(1, 0, 0))
 
+    # Scenario: Tuples have fixed slots and no per-instance dictionary
+    def test_tuples_have_slots(self):
+        for t in [Tuple(1, 2, 3, 4), Point(1, 2, 3), Vector(1, 2, 3)]:
+            self.assertFalse(hasattr(t, '__dict__'))
+            with self.assertRaises(AttributeError):
+                t.v = 1
+
+    # Scenario: Arithmetic keeps the point and vector types
+    def test_arithmetic_result_types(self):
+        p = Point(3, 2, 1)
+        v = Vector(5, 6, 7)
+        self.assertIs(type(p - p), Vector)
+        self.assertIs(type(p - v), Point)
+        self.assertIs(type(p + v), Point)
+        self.assertIs(type(v + p), Point)
+        self.assertIs(type(v + v), Vector)
+        self.assertIs(type(v * 2), Vector)
+        self.assertIs(type(-v), Vector)
+        self.assertIs(type(p + p), Tuple)
+        self.assertEqual(p + p, Tuple(6, 4, 2, 2))
+        self.assertIs(type(Vector.normalize(v)), Vector)
+
+    # Scenario: Equality accepts equal infinities and values within epsilon
+    def test_equality_epsilon_and_infinity(self):
+        self.assertEqual(Point(1, 2, 3), Point(1.000001, 2, 3))
+        self.assertNotEqual(Point(1, 2, 3), Point(1.001, 2, 3))
+        self.assertEqual(Point(math.inf, 0, -math.inf), Point(math.inf, 0, -math.inf))
+        self.assertNotEqual(Point(math.inf, 0, 0), Point(-math.inf, 0, 0))
+
 if __name__ == '__main__':
     unittest.main()
     
\ No newline at end of file
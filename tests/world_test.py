@@ -5,6 +5,8 @@ import unittest
 sys.path.append(os.path.abspath('..'))
 from color import Color
 from computations import Computations
+from cylinder import Cylinder
+from group import Group
 from intersection import Intersection
 from light import PointLight
 from ray import Ray
@@ -113,6 +115,23 @@ class TestWorld(unittest.TestCase):
         p = Point(-20, 20, -20)
         self.assertEqual(World.is_shadowed(w, p), False)
 
+    # Scenario: The closest hit of a world matches the hit of intersect_world
+    def test_hit_world(self):
+        w = World.default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        hit = World.hit_world(w, r)
+        self.assertEqual(hit, Intersection.hit(World.intersect_world(w, r)))
+        self.assertEqual(hit.t, 4)
+        self.assertIsNone(World.hit_world(w, Ray(Point(0, 0, -5), Vector(0, 1, 0))))
+
+    # Scenario: An occlusion query only reports hits closer than the distance
+    def test_is_occluded_within_distance(self):
+        w = World.default_world()
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        self.assertTrue(World.is_occluded(w, r, 4.5))
+        self.assertFalse(World.is_occluded(w, r, 3.9))
+        self.assertFalse(World.is_occluded(w, Ray(Point(0, 0, 5), Vector(0, 0, 1)), 100))
+
     # Scenario: There is no shadow when an object is behind the point
     def test_no_shadow_object_behing_point(self):
         w = World.default_world()
@@ -288,6 +307,110 @@ class TestWorld(unittest.TestCase):
         comps = Computations.prepare_computations(xs[0], r, xs)
         color = World.shade_hit(w, comps, 5)
         self.assertEqual(color, Color(0.93391, 0.69643, 0.69243))
+
+    # Scenario: A world of many objects builds a hierarchy over the bounded ones
+    def test_world_hierarchy_matches_linear_search(self):
+        w = World()
+        for i in range(10):
+            for j in range(10):
+                s = Sphere()
+                s.transform = Transformations.translation(3 * i, 3 * j, 0).dot(Transformations.scaling(0.5 + 0.05 * j, 1, 1))
+                w.objects.append(s)
+        floor = Plane()
+        floor.transform = Transformations.translation(0, -1, 0)
+        pipe = Cylinder()
+        w.objects.extend([floor, pipe])
+        bvh, unbounded = World.acceleration(w)
+        self.assertIsNotNone(bvh)
+        self.assertEqual(len(bvh.primitives), 100)
+        self.assertEqual(unbounded, [floor, pipe])
+
+        for origin, direction in [(Point(-5, 4, -10), Vector(1, 0.2, 1)), (Point(13.5, 30, 0.1), Vector(0, -1, 0)), (Point(6, 6, -5), Vector(0, 0, 1)), (Point(-5, -0.5, 0), Vector(-1, 0, 0))]:
+            r = Ray(origin, Vector.normalize(direction))
+            expected = sorted([x for object in w.objects for x in object.intersect(r)], key = lambda x: x.t)
+            self.assertEqual([(x.t, x.object) for x in World.intersect_world(w, r)], [(x.t, x.object) for x in expected])
+            self.assertEqual(World.hit_world(w, r), Intersection.hit(expected))
+            self.assertEqual(World.is_occluded(w, r, 50), any(0 <= x.t < 50 for x in expected))
+
+    # Scenario: Changing the objects of a world rebuilds its hierarchy
+    def test_world_hierarchy_rebuilt_when_objects_change(self):
+        w = World()
+        w.objects = [Sphere() for _ in range(World.bvh_threshold)]
+        for index, s in enumerate(w.objects):
+            s.transform = Transformations.translation(3 * index, 0, 0)
+        bvh, _ = World.acceleration(w)
+        self.assertIs(World.acceleration(w)[0], bvh)
+        r = Ray(Point(-5, 0, 0), Vector(1, 0, 0))
+        self.assertIs(World.hit_world(w, r).object, w.objects[0])
+
+        first = Sphere()
+        first.transform = Transformations.translation(-3, 0, 0)
+        w.objects.append(first)
+        self.assertIsNot(World.acceleration(w)[0], bvh)
+        self.assertIs(World.hit_world(w, r).object, first)
+
+        w.objects[-1] = Sphere()
+        w.objects[-1].transform = Transformations.translation(0, 10, 0)
+        self.assertIs(World.hit_world(w, r).object, w.objects[0])
+        del w.objects[1:]
+        self.assertIsNone(World.acceleration(w)[0])
+        self.assertEqual(World.acceleration(w)[1], w.objects)
+
+    # Scenario: Moving or regrouping an object of a world rebuilds its hierarchy
+    def test_world_hierarchy_rebuilt_when_object_moves(self):
+        w = World()
+        spheres = [Sphere() for _ in range(10)]
+        for index, s in enumerate(spheres):
+            s.transform = Transformations.translation(0, 0, 3 * index)
+        g = Group()
+        g.add_child(Sphere())
+        g.transform = Transformations.translation(0, 20, 0)
+        w.objects = spheres + [g]
+        r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+        bvh, _ = World.acceleration(w)
+        self.assertEqual(World.hit_world(w, r).t, 4)
+
+        spheres[0].transform = Transformations.translation(0, 10, 0)
+        self.assertIsNot(World.acceleration(w)[0], bvh)
+        self.assertEqual(World.hit_world(w, r).t, 7)
+        self.assertEqual(World.intersect_world(w, r)[0].t, 7)
+        self.assertFalse(World.is_occluded(w, r, 6.5))
+
+        # a child added below a top-level group moves its box too
+        s = Sphere()
+        s.transform = Transformations.translation(0, -20, -2)
+        g.add_child(s)
+        self.assertEqual(World.hit_world(w, r).t, 2)
+        self.assertTrue(World.is_occluded(w, r, 6.5))
+
+        # a shape taken out of the world stops reporting to it
+        version = w.objects.version
+        w.objects.remove(spheres[1])
+        self.assertEqual(spheres[1].owners, [])
+        spheres[1].transform = Transformations.translation(0, 0, -1)
+        self.assertEqual(w.objects.version, version + 1)
+
+    # Scenario: The world hierarchy is rebuilt after objects are repeated or reordered
+    def test_world_hierarchy_rebuilt_when_objects_repeated(self):
+        w = World()
+        spheres = [Sphere() for _ in range(World.bvh_threshold // 2)]
+        for index, s in enumerate(spheres):
+            s.transform = Transformations.translation(0, 0, 3 * index)
+        w.objects = spheres
+        self.assertIsNone(World.acceleration(w)[0])
+        w.objects *= 2
+        self.assertIsNotNone(World.acceleration(w)[0])
+        self.assertEqual(len(spheres[0].owners), 2)
+        self.assertTrue(all(owner is w.objects for owner in spheres[0].owners))
+
+        version = w.objects.version
+        w.objects.reverse()
+        w.objects.sort(key = id)
+        self.assertEqual(w.objects.version, version + 2)
+
+        w.objects *= 0
+        self.assertEqual(World.acceleration(w), (None, []))
+        self.assertEqual(spheres[0].owners, [])
   
 if __name__ == '__main__':
     unittest.main()
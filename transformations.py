@@ -49,3 +49,79 @@ class Transformations:
         m[2][0] = z_x
         m[2][1] = z_y
         return m
+
+    # a TransformBuilder starting from the identity
+    def builder() -> 'TransformBuilder':
+        return TransformBuilder()
+
+class TransformBuilder:
+    # a fluent chain of transformations, applied in the order they are called:
+    #   Transformations.builder().scale(2, 2, 2).rotate_y(math.pi / 4).translate(0, 1, 0)
+    # is translation(0, 1, 0).dot(rotation_y(math.pi / 4)).dot(scaling(2, 2, 2)).
+    # every step is recorded along with its own inverse, so the inverse of the
+    # whole chain is their product in reverse rather than a numerical inversion.
+    def __init__(self):
+        self.steps = []
+        # True while the chain holds only rotations, translations and scales
+        # that are the same along every axis
+        self.similarity = True
+
+    def add_step(self, matrix: np.ndarray, inverse: np.ndarray, similarity: bool) -> 'TransformBuilder':
+        self.steps.append((matrix, inverse))
+        self.similarity = self.similarity and similarity
+        return self
+
+    def translate(self, x, y, z) -> 'TransformBuilder':
+        return self.add_step(Transformations.translation(x, y, z), Transformations.translation(-x, -y, -z), True)
+
+    def scale(self, x, y, z) -> 'TransformBuilder':
+        return self.add_step(Transformations.scaling(x, y, z), Transformations.scaling(1 / x, 1 / y, 1 / z), x == y == z)
+
+    # the inverse of a rotation is its transpose
+    def rotate_x(self, radians) -> 'TransformBuilder':
+        rotation = Transformations.rotation_x(radians)
+        return self.add_step(rotation, rotation.transpose(), True)
+
+    def rotate_y(self, radians) -> 'TransformBuilder':
+        rotation = Transformations.rotation_y(radians)
+        return self.add_step(rotation, rotation.transpose(), True)
+
+    def rotate_z(self, radians) -> 'TransformBuilder':
+        rotation = Transformations.rotation_z(radians)
+        return self.add_step(rotation, rotation.transpose(), True)
+
+    def shear(self, x_y, x_z, y_x, y_z, z_x, z_y) -> 'TransformBuilder':
+        shearing = Transformations.shearing(x_y, x_z, y_x, y_z, z_x, z_y)
+        return self.add_step(shearing, TransformBuilder.shearing_inverse(shearing), False)
+
+    # a shearing matrix only mixes x, y and z, so its inverse is the adjugate of
+    # that 3 x 3 block over its determinant
+    def shearing_inverse(shearing: np.ndarray) -> np.ndarray:
+        (a, b, c), (d, e, f), (g, h, i) = shearing[:3, :3].tolist()
+        cofactors = [[e * i - f * h, c * h - b * i, b * f - c * e],
+                     [f * g - d * i, a * i - c * g, c * d - a * f],
+                     [d * h - e * g, b * g - a * h, a * e - b * d]]
+        determinant = a * cofactors[0][0] + b * cofactors[1][0] + c * cofactors[2][0]
+        if determinant == 0:
+            raise ValueError("shearing is not invertible")
+        inverse = np.identity(4)
+        inverse[:3, :3] = np.array(cofactors) / determinant
+        return inverse
+
+    @property
+    def matrix(self) -> np.ndarray:
+        matrix = np.identity(4)
+        for step, _ in self.steps:
+            matrix = step.dot(matrix)
+        return matrix
+
+    @property
+    def inverse(self) -> np.ndarray:
+        inverse = np.identity(4)
+        for _, step in self.steps:
+            inverse = inverse.dot(step)
+        return inverse
+
+    # gives a shape, pattern or camera the chain's transform together with its inverse
+    def apply(self, transformable: 'Transformable') -> None:
+        transformable.set_transform(self.matrix, self.inverse, self.similarity)
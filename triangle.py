@@ -3,7 +3,10 @@ from intersection import Intersection
 from ray import Ray
 from shape import Shape
 from tuple import *
-from typing import Iterable
+from typing import Iterable, Tuple as PythonTuple
+
+import math
+import numpy as np
 
 class Triangle(Shape):
     def __init__(self, p1: Point, p2: Point, p3: Point):
@@ -39,6 +42,29 @@ class Triangle(Shape):
         t = f * self.e2.dot(origin_cross_e1)
         return [Intersection(t, self, u, v)]
 
+    def local_intersect_batch(self, origins: np.ndarray, directions: np.ndarray) -> PythonTuple[np.ndarray, np.ndarray, np.ndarray]:
+        p1 = np.array([self.p1.x, self.p1.y, self.p1.z])
+        e1 = np.array([self.e1.x, self.e1.y, self.e1.z])
+        e2 = np.array([self.e2.x, self.e2.y, self.e2.z])
+        direction = directions[:, :3]
+
+        dir_cross_e2 = np.cross(direction, e2)
+        det = dir_cross_e2.dot(e1)
+        hit = np.abs(det) >= Constants.epsilon
+
+        f = 1.0 / np.where(hit, det, 1)
+
+        p1_to_origin = origins[:, :3] - p1
+        u = f * np.einsum('ij,ij->i', p1_to_origin, dir_cross_e2)
+        hit &= (u >= 0) & (u <= 1)
+
+        origin_cross_e1 = np.cross(p1_to_origin, e1)
+        v = f * np.einsum('ij,ij->i', direction, origin_cross_e1)
+        hit &= (v >= 0) & ((u + v) <= 1)
+
+        t = np.where(hit, f * origin_cross_e1.dot(e2), math.inf)
+        return t[:, np.newaxis], u[:, np.newaxis], v[:, np.newaxis]
+
     def local_normal_at(self, local_point: Point = None, intersection: Intersection = None) -> Vector:
         return self.normal
 
@@ -0,0 +1,202 @@
+import math
+import numpy as np
+
+from bounds import Bounds
+from intersection import Intersection
+from ray import Ray
+from shape import Shape
+from tuple import *
+from typing import Iterable, List, Tuple as PythonTuple
+
+class TriangleMesh(Shape):
+    # the number of faces a leaf of the mesh's BVH may hold. smaller blocks spend
+    # more on per-call overhead than the vectorized intersection saves.
+    block_size: int = 16
+
+    # vertices and normals are V x 3 and N x 3 float arrays. faces is an F x 3
+    # array of vertex indices and face_normals an F x 3 array of normal indices,
+    # with -1 for faces that have no vertex normals and are shaded flat.
+    def __init__(self, vertices: np.ndarray, faces: np.ndarray, normals: np.ndarray = None, face_normals: np.ndarray = None):
+        super().__init__()
+        self.vertices: np.ndarray = np.asarray(vertices, dtype = float)
+        self.normals: np.ndarray = None if normals is None else np.asarray(normals, dtype = float)
+        self.bvh = None
+        self.leaf_size: int = None
+        self.set_faces(np.asarray(faces, dtype = np.int64).reshape(-1, 3), None if face_normals is None else np.asarray(face_normals, dtype = np.int64).reshape(-1, 3))
+
+    def __eq__(self, other):
+        return super().__eq__(other) and np.array_equal(self.vertices, other.vertices) and np.array_equal(self.faces, other.faces)
+
+    def set_faces(self, faces: np.ndarray, face_normals: np.ndarray) -> None:
+        self.faces: np.ndarray = faces
+        self.face_normals: np.ndarray = face_normals
+
+        # per-face data for Moller-Trumbore, as Triangle precomputes it
+        self.p1: np.ndarray = self.vertices[faces[:, 0]]
+        self.e1: np.ndarray = self.vertices[faces[:, 1]] - self.p1
+        self.e2: np.ndarray = self.vertices[faces[:, 2]] - self.p1
+        flat_normals = np.cross(self.e2, self.e1)
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            self.flat_normals: np.ndarray = flat_normals / np.linalg.norm(flat_normals, axis = 1)[:, np.newaxis]
+
+        used = self.vertices[faces.ravel()]
+        self.box_min: List[float] = used.min(axis = 0).tolist() if len(used) else [math.inf] * 3
+        self.box_max: List[float] = used.max(axis = 0).tolist() if len(used) else [-math.inf] * 3
+
+    # the arrays that make up the mesh and its BVH, keyed by name, from which
+    # from_arrays rebuilds it without recomputing anything
+    def mesh_arrays(self) -> dict:
+        arrays = {'faces': self.faces, 'p1': self.p1, 'e1': self.e1, 'e2': self.e2, 'flat_normals': self.flat_normals,
+                  'box': np.array(self.box_min + self.box_max, dtype = float)}
+        if self.face_normals is not None:
+            arrays['face_normals'] = self.face_normals
+        if self.bvh is not None:
+            arrays.update({'node_bounds': self.bvh.node_bounds, 'child_offsets': self.bvh.child_offsets, 'child_indices': self.bvh.child_indices,
+                           'prim_offsets': self.bvh.prim_offsets, 'prim_bounds': self.bvh.prim_bounds,
+                           'blocks': np.array([[block.start, block.end] for block in self.bvh.primitives], dtype = np.int64).reshape(-1, 2),
+                           'leaf_size': np.array(self.leaf_size, dtype = np.int64)})
+        return arrays
+
+    def from_arrays(vertices: np.ndarray, normals: np.ndarray, arrays: dict) -> 'TriangleMesh':
+        from bvh import BVH
+
+        mesh = TriangleMesh.__new__(TriangleMesh)
+        Shape.__init__(mesh)
+        mesh.vertices = vertices
+        mesh.normals = normals
+        mesh.faces = arrays['faces']
+        mesh.face_normals = arrays.get('face_normals')
+        mesh.p1 = arrays['p1']
+        mesh.e1 = arrays['e1']
+        mesh.e2 = arrays['e2']
+        mesh.flat_normals = arrays['flat_normals']
+        mesh.box_min = arrays['box'][:3].tolist()
+        mesh.box_max = arrays['box'][3:].tolist()
+        mesh.bvh = None
+        mesh.leaf_size = None
+        if 'node_bounds' in arrays:
+            blocks = [FaceBlock(mesh, start, end) for start, end in arrays['blocks'].tolist()]
+            mesh.bvh = BVH(arrays['node_bounds'], arrays['child_offsets'], arrays['child_indices'], arrays['prim_offsets'], arrays['prim_bounds'], blocks, mesh)
+            mesh.leaf_size = int(arrays['leaf_size'])
+        return mesh
+
+    def face_count(self) -> int:
+        return len(self.faces)
+
+    def local_intersect(self, ray: Ray) -> Iterable[Intersection]:
+        if self.bvh is not None:
+            return self.bvh.intersect(ray)
+
+        if not self.bounds_of().intersects(ray):
+            return []
+
+        return sorted(self.intersect_faces(ray, 0, self.face_count()), key = lambda intersection: intersection.t)
+
+    def local_intersect_closest(self, ray: Ray, t_max: float) -> Intersection:
+        if self.bvh is not None:
+            return self.bvh.intersect_closest(ray, t_max)
+
+        if not self.bounds_of().intersects(ray):
+            return None
+
+        return self.intersect_faces_closest(ray, 0, self.face_count(), t_max)
+
+    def local_occluded(self, ray: Ray, distance: float) -> bool:
+        if self.bvh is not None:
+            return self.bvh.occluded(ray, distance)
+
+        if not self.bounds_of().intersects(ray):
+            return False
+
+        return self.intersect_faces_closest(ray, 0, self.face_count(), distance) is not None
+
+    # vectorized Moller-Trumbore against the faces start to end, returning the
+    # t, u, v and face index of every hit
+    def hit_faces(self, ray: Ray, start: int, end: int) -> PythonTuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        direction = np.array([ray.direction.x, ray.direction.y, ray.direction.z])
+        origin = np.array([ray.origin.x, ray.origin.y, ray.origin.z])
+        e1 = self.e1[start:end]
+        e2 = self.e2[start:end]
+
+        dir_cross_e2 = np.cross(direction, e2)
+        det = np.einsum('ij,ij->i', e1, dir_cross_e2)
+        hit = np.abs(det) >= Constants.epsilon
+
+        f = 1.0 / np.where(hit, det, 1)
+
+        p1_to_origin = origin - self.p1[start:end]
+        u = f * np.einsum('ij,ij->i', p1_to_origin, dir_cross_e2)
+        hit &= (u >= 0) & (u <= 1)
+
+        origin_cross_e1 = np.cross(p1_to_origin, e1)
+        v = f * origin_cross_e1.dot(direction)
+        hit &= (v >= 0) & ((u + v) <= 1)
+
+        t = f * np.einsum('ij,ij->i', e2, origin_cross_e1)
+        hits = np.flatnonzero(hit)
+        return t[hits], u[hits], v[hits], hits + start
+
+    def intersect_faces(self, ray: Ray, start: int, end: int) -> List[Intersection]:
+        ts, us, vs, faces = self.hit_faces(ray, start, end)
+        return [Intersection(t, self, u, v, face) for t, u, v, face in zip(ts.tolist(), us.tolist(), vs.tolist(), faces.tolist())]
+
+    def intersect_faces_closest(self, ray: Ray, start: int, end: int, t_max: float) -> Intersection:
+        ts, us, vs, faces = self.hit_faces(ray, start, end)
+        in_range = np.flatnonzero((ts >= 0) & (ts < t_max))
+        if len(in_range) == 0:
+            return None
+
+        nearest = in_range[np.argmin(ts[in_range])]
+        return Intersection(float(ts[nearest]), self, float(us[nearest]), float(vs[nearest]), int(faces[nearest]))
+
+    # interpolates the vertex normals as SmoothTriangle does, or uses the face
+    # normal as Triangle does when the face has none
+    def local_normal_at(self, local_point: Point = None, intersection: Intersection = None) -> Vector:
+        face = intersection.face
+        if self.face_normals is None or self.face_normals[face, 0] < 0:
+            return Vector(*self.flat_normals[face].tolist())
+
+        n1, n2, n3 = self.normals[self.face_normals[face]]
+        u = intersection.u
+        v = intersection.v
+        return Vector(*(n2 * u + n3 * v + n1 * (1 - u - v)).tolist())
+
+    def bounds_of(self) -> Bounds:
+        return Bounds(Point(*self.box_min), Point(*self.box_max))
+
+    # builds a BVH over the mesh's faces, reordering them so that every leaf
+    # covers a contiguous block of up to max(threshold, block_size) faces
+    def divide(self, threshold: int) -> None:
+        from bvh import BVH
+
+        leaf_size = max(threshold, TriangleMesh.block_size)
+        if self.face_count() <= leaf_size or (self.bvh is not None and self.leaf_size == leaf_size):
+            return
+
+        corners = np.stack((self.p1, self.p1 + self.e1, self.p1 + self.e2), axis = 1)
+        boxes = np.hstack((corners.min(axis = 1), corners.max(axis = 1)))
+        bvh, order = BVH.from_boxes(boxes, leaf_size, lambda start, end: FaceBlock(self, start, end))
+        bvh.root_shape = self
+        self.set_faces(self.faces[order], None if self.face_normals is None else self.face_normals[order])
+        self.bvh = bvh
+        self.leaf_size = leaf_size
+
+    def divide_sah(self, leaf_size: int = 4, bins: int = 12) -> None:
+        self.divide(leaf_size)
+
+class FaceBlock:
+    # a contiguous run of a mesh's faces, the primitive in the leaves of its BVH.
+    # rays reach it already in the mesh's object space.
+    def __init__(self, mesh: TriangleMesh, start: int, end: int):
+        self.mesh: TriangleMesh = mesh
+        self.start: int = start
+        self.end: int = end
+
+    def intersect(self, ray: Ray) -> List[Intersection]:
+        return self.mesh.intersect_faces(ray, self.start, self.end)
+
+    def intersect_closest(self, ray: Ray, t_max: float = math.inf) -> Intersection:
+        return self.mesh.intersect_faces_closest(ray, self.start, self.end, t_max)
+
+    def occluded(self, ray: Ray, distance: float) -> bool:
+        return self.mesh.intersect_faces_closest(ray, self.start, self.end, distance) is not None
@@ -2,6 +2,10 @@ import math
 from constants import Constants
 
 class Tuple:
+    # tuples are created by the million while rendering, so they carry fixed
+    # slots rather than a __dict__, and the subclasses set them directly
+    __slots__ = ('x', 'y', 'z', 'w')
+
     def __init__(self, x, y, z, w):
         self.x = x
         self.y = y
@@ -9,13 +13,28 @@ class Tuple:
         self.w = w
 
     def __eq__(self, other):
-        return math.isclose(self.x, other.x, abs_tol = Constants.epsilon) and math.isclose(self.y, other.y, abs_tol = Constants.epsilon) and math.isclose(self.z, other.z, abs_tol = Constants.epsilon) and math.isclose(self.w, other.w, abs_tol = Constants.epsilon)
+        # the plain differences settle almost every comparison. isclose also
+        # accepts equal infinities and huge values within its relative tolerance.
+        epsilon = Constants.epsilon
+        if abs(self.x - other.x) <= epsilon and abs(self.y - other.y) <= epsilon and abs(self.z - other.z) <= epsilon and abs(self.w - other.w) <= epsilon:
+            return True
+        return math.isclose(self.x, other.x, abs_tol = epsilon) and math.isclose(self.y, other.y, abs_tol = epsilon) and math.isclose(self.z, other.z, abs_tol = epsilon) and math.isclose(self.w, other.w, abs_tol = epsilon)
 
     def __add__(self, other):
-        return Tuple.math_type(self.x + other.x, self.y + other.y, self.z + other.z, self.w + other.w)
+        w = self.w + other.w
+        if w == 0:
+            return Vector(self.x + other.x, self.y + other.y, self.z + other.z)
+        elif w == 1:
+            return Point(self.x + other.x, self.y + other.y, self.z + other.z)
+        return Tuple(self.x + other.x, self.y + other.y, self.z + other.z, w)
 
     def __sub__(self, other):
-        return Tuple.math_type(self.x - other.x, self.y - other.y, self.z - other.z, self.w - other.w)
+        w = self.w - other.w
+        if w == 0:
+            return Vector(self.x - other.x, self.y - other.y, self.z - other.z)
+        elif w == 1:
+            return Point(self.x - other.x, self.y - other.y, self.z - other.z)
+        return Tuple(self.x - other.x, self.y - other.y, self.z - other.z, w)
 
     def __mul__(self, other):
         return Tuple.math_type(self.x * other, self.y * other, self.z * other, self.w * other)
@@ -41,8 +60,8 @@ class Tuple:
     # TODO: should this be in Vector?
     def normalize(tuple: 'Tuple') -> 'Tuple':
         # TODO: Can only normalize non-zero magnitude vectors
-        magnitude = tuple.magnitude()
-        return Tuple(tuple.x / magnitude, tuple.y / magnitude, tuple.z / magnitude, tuple.w / magnitude)
+        magnitude = math.sqrt(tuple.x * tuple.x + tuple.y * tuple.y + tuple.z * tuple.z + tuple.w * tuple.w)
+        return Tuple.math_type(tuple.x / magnitude, tuple.y / magnitude, tuple.z / magnitude, tuple.w / magnitude)
 
     # TODO: should this be in Vector?
     def cross(self, other):
@@ -60,10 +79,48 @@ class Tuple:
         return f"x={self.x} y={self.y} z={self.z}"
 
 class Point(Tuple):
+    __slots__ = ()
+
     def __init__(self, x, y, z):
-        super().__init__(x, y, z, 1)
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = 1
+
+    def __add__(self, other):
+        if other.w == 0:
+            return Point(self.x + other.x, self.y + other.y, self.z + other.z)
+        return Tuple.__add__(self, other)
+
+    def __sub__(self, other):
+        if other.w == 1:
+            return Vector(self.x - other.x, self.y - other.y, self.z - other.z)
+        elif other.w == 0:
+            return Point(self.x - other.x, self.y - other.y, self.z - other.z)
+        return Tuple.__sub__(self, other)
 
 
 class Vector(Tuple):
+    __slots__ = ()
+
     def __init__(self, x, y, z):
-        super().__init__(x, y, z, 0)
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = 0
+
+    def __add__(self, other):
+        if other.w == 0:
+            return Vector(self.x + other.x, self.y + other.y, self.z + other.z)
+        return Tuple.__add__(self, other)
+
+    def __sub__(self, other):
+        if other.w == 0:
+            return Vector(self.x - other.x, self.y - other.y, self.z - other.z)
+        return Tuple.__sub__(self, other)
+
+    def __mul__(self, other):
+        return Vector(self.x * other, self.y * other, self.z * other)
+
+    def __neg__(self):
+        return Vector(-self.x, -self.y, -self.z)
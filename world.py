@@ -1,6 +1,7 @@
 import math
 import numpy as np
 
+from bvh import BVH
 from computations import Computations
 from color import Color
 from intersection import Intersection
@@ -9,13 +10,159 @@ from ray import Ray
 from sphere import Sphere
 from transformations import Transformations
 from tuple import Point, Vector
-from typing import Iterable
+from shape import Shape
+from typing import Iterable, List, Tuple as PythonTuple
+
+class ObjectList(list):
+    # the objects of a world. it counts the changes made to it and to the boxes
+    # of the shapes in it, which report to every ObjectList holding them, so
+    # that the world can tell when the hierarchy built over them is out of date
+    def __init__(self, objects: Iterable[Shape] = ()):
+        super().__init__(objects)
+        self.version = 0
+        for object in self:
+            object.owners.append(self)
+
+    def __reduce__(self):
+        return (ObjectList, (list(self),))
+
+    def changed(self) -> None:
+        self.version += 1
+
+    def added(self, objects: List[Shape]) -> None:
+        for object in objects:
+            object.owners.append(self)
+        self.changed()
+
+    def removed(self, objects: List[Shape]) -> None:
+        for object in objects:
+            # by identity, since equal lists are not the same owner
+            for index, owner in enumerate(object.owners):
+                if owner is self:
+                    del object.owners[index]
+                    break
+        self.changed()
+
+    def append(self, object: Shape) -> None:
+        super().append(object)
+        self.added([object])
+
+    def extend(self, objects: Iterable[Shape]) -> None:
+        objects = list(objects)
+        super().extend(objects)
+        self.added(objects)
+
+    def __iadd__(self, objects: Iterable[Shape]) -> 'ObjectList':
+        self.extend(objects)
+        return self
+
+    def __imul__(self, count: int) -> 'ObjectList':
+        objects = list(self)
+        super().__imul__(count)
+        if count > 0:
+            self.added(objects * (count - 1))
+        else:
+            self.removed(objects)
+        return self
+
+    # reordering keeps the same objects, but the hierarchy lists them in order
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self.changed()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self.changed()
+
+    def insert(self, index: int, object: Shape) -> None:
+        super().insert(index, object)
+        self.added([object])
+
+    def remove(self, object: Shape) -> None:
+        super().remove(object)
+        self.removed([object])
+
+    def pop(self, index: int = -1) -> Shape:
+        object = super().pop(index)
+        self.removed([object])
+        return object
+
+    def clear(self) -> None:
+        objects = list(self)
+        super().clear()
+        self.removed(objects)
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            replaced = self[index]
+            value = list(value)
+            super().__setitem__(index, value)
+            self.removed(replaced)
+            self.added(value)
+        else:
+            replaced = self[index]
+            super().__setitem__(index, value)
+            self.removed([replaced])
+            self.added([value])
+
+    def __delitem__(self, index) -> None:
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        self.removed(removed)
 
 class World:
+    # worlds with fewer bounded objects than this are simply tested one by one
+    bvh_threshold = 8
+
     def __init__(self):
         self.objects: Iterable[Sphere] = []
         self.light: PointLight = None
 
+    # objects may be assigned any list, which is copied into an ObjectList
+    @property
+    def objects(self) -> ObjectList:
+        return self._objects
+
+    @objects.setter
+    def objects(self, objects: Iterable[Shape]) -> None:
+        self._objects = objects if isinstance(objects, ObjectList) else ObjectList(objects)
+        self._bvh_version = None
+
+    # the hierarchy over the objects with finite world space bounds and the
+    # unbounded rest, such as planes, which every ray is tested against. both are
+    # built on first use after objects, or the box of any of them, changes.
+    # below bvh_threshold there is no hierarchy and every object is in the
+    # unbounded list, in order.
+    def acceleration(world: 'World') -> PythonTuple[BVH, List[Shape]]:
+        objects = world.objects
+        if world._bvh_version == objects.version:
+            return world._bvh, world._unbounded
+
+        bounded = []
+        boxes = []
+        unbounded = []
+        for object in objects:
+            bounds = object.parent_space_bounds_of()
+            # nothing can hit an object with an empty box, such as the
+            # intersection of two shapes that do not meet
+            if bounds.is_empty():
+                continue
+            box = BVH.box_row(bounds)
+            if all(math.isfinite(value) for value in box):
+                bounded.append(object)
+                boxes.append(box)
+            else:
+                unbounded.append(object)
+
+        if not bounded or len(bounded) < World.bvh_threshold:
+            world._bvh, world._unbounded = None, list(objects)
+        else:
+            bvh, order = BVH.from_boxes(np.array(boxes, dtype = float), 1, lambda start, end: start)
+            bvh.primitives = [bounded[order[start]] for start in bvh.primitives]
+            world._bvh, world._unbounded = bvh, unbounded
+        world._bvh_version = objects.version
+        return world._bvh, world._unbounded
+
     def default_world():
         world = World()
         world.light = PointLight(Point(-10, 10, -10), Color(1, 1, 1))
@@ -32,8 +179,9 @@ class World:
         return world
 
     def intersect_world(world: 'World', ray: Ray) -> Iterable[Intersection]:
-        intersections: Iterable[Intersection] = []
-        for object in world.objects:
+        bvh, unbounded = World.acceleration(world)
+        intersections: Iterable[Intersection] = [] if bvh is None else bvh.intersect(ray)
+        for object in unbounded:
             object_intersections = object.intersect(ray)
             intersections.extend(object_intersections)
 
@@ -52,9 +200,66 @@ class World:
         else:
             return surface + reflected + refracted
 
+    # find the hit of every ray in a batch (N x 4 origin and direction arrays).
+    # objects with a batch kernel are intersected with all rays at once, the
+    # rest fall back to intersecting one ray at a time.
+    def hit_batch(world: 'World', origins: np.ndarray, directions: np.ndarray) -> List[Intersection]:
+        count = len(origins)
+        rows = np.arange(count)
+        best_t = np.full(count, math.inf)
+        best_hits: List[Intersection] = [None] * count
+        rays = None
+
+        for object in world.objects:
+            if object.has_batch_kernel():
+                ts, us, vs = object.intersect_batch(origins, directions)
+                ts = np.where(ts >= 0, ts, math.inf)
+                columns = np.argmin(ts, axis = 1)
+                nearest = ts[rows, columns]
+                for index in np.flatnonzero(nearest < best_t):
+                    column = columns[index]
+                    u = None if us is None else float(us[index, column])
+                    v = None if vs is None else float(vs[index, column])
+                    best_hits[index] = Intersection(float(nearest[index]), object, u, v)
+                    best_t[index] = nearest[index]
+            else:
+                if rays is None:
+                    rays = World.rays_from_arrays(origins, directions)
+                for index, ray in enumerate(rays):
+                    hit = object.intersect_closest(ray, best_t[index])
+                    if hit is not None:
+                        best_hits[index] = hit
+                        best_t[index] = hit.t
+
+        return best_hits
+
+    def rays_from_arrays(origins: np.ndarray, directions: np.ndarray) -> List[Ray]:
+        return [Ray(Point(*origin[:3]), Vector(*direction[:3])) for origin, direction in zip(origins.tolist(), directions.tolist())]
+
+    # closest-hit query: the same intersection Intersection.hit would pick from
+    # intersect_world, without collecting and sorting every intersection
+    def hit_world(world: 'World', ray: Ray) -> Intersection:
+        bvh, unbounded = World.acceleration(world)
+        closest = None
+        t_max = math.inf
+        for object in unbounded:
+            hit = object.intersect_closest(ray, t_max)
+            if hit is not None:
+                closest = hit
+                t_max = hit.t
+
+        if bvh is not None:
+            hit = bvh.intersect_closest(ray, t_max)
+            if hit is not None:
+                closest = hit
+
+        return closest
+
     def color_at(world: 'World', ray: Ray, remaining: int = 5) -> Color:
-        intersections = World.intersect_world(world, ray)
-        hit = Intersection.hit(intersections)
+        hit = World.hit_world(world, ray)
+        return World.color_for_hit(world, hit, ray, remaining)
+
+    def color_for_hit(world: 'World', hit: Intersection, ray: Ray, remaining: int = 5) -> Color:
         if hit is None:
             return Color(0, 0, 0)
         else:
@@ -74,13 +279,16 @@ class World:
         direction = Vector.normalize(v)
 
         r = Ray(point, direction)
-        intersections = World.intersect_world(world, r)
+        return World.is_occluded(world, r, distance)
 
-        h = Intersection.hit(intersections)
-        if h is not None and h.t < distance:
-            return True
-        else:
-            return False
+    # any-hit query: does anything intersect the ray with 0 <= t < distance?
+    def is_occluded(world: 'World', ray: Ray, distance: float) -> bool:
+        bvh, unbounded = World.acceleration(world)
+        for object in unbounded:
+            if object.occluded(ray, distance):
+                return True
+
+        return bvh is not None and bvh.occluded(ray, distance)
 
     def reflected_color(world: 'World', comps: Computations, remaining: int = 5) -> Color:
         if remaining <= 0: